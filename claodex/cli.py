@@ -732,6 +732,7 @@ class ClaodexApplication:
         )
         target = "claude"
         bus = UIEventBus(workspace_root=workspace_root, default_target=target)
+        router: Router | None = None
         try:
             router = Router(
                 workspace_root=workspace_root,
@@ -882,6 +883,9 @@ class ClaodexApplication:
                     self._log_event(bus, "error", str(exc))
                     continue
         finally:
+            # release session-file handles and the watcher before the bus
+            if router is not None:
+                router.close()
             bus.close()
 
     def _clear_watches(self, router: Router) -> None:
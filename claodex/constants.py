@@ -45,3 +45,7 @@ CLAUDE_STOP_EVENT_RE = (
     r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d+Z)"
     r"\s+\[DEBUG\]\s+Getting matching hook commands for Stop"
 )
+
+# literal part of the Stop hook dispatch line. appended debug-log bytes
+# without it are skipped before any line splitting or regex matching.
+CLAUDE_STOP_EVENT_NEEDLE = b"Getting matching hook commands for Stop"
@@ -2,17 +2,22 @@
 
 from __future__ import annotations
 
+import bisect
+import io
 import json
+import os
 import re
 import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from enum import IntEnum
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Iterator
 
 from .constants import (
     AGENTS,
     CLAUDE_DEBUG_LOG_PATTERN,
+    CLAUDE_STOP_EVENT_NEEDLE,
     CLAUDE_STOP_EVENT_RE,
     STUCK_SKIP_ATTEMPTS,
     STUCK_SKIP_SECONDS,
@@ -38,16 +43,69 @@ from .extract import (
 from .state import (
     Participant,
     SessionParticipants,
-    count_lines,
     peer_agent,
     read_delivery_cursor,
-    read_lines_between,
     read_read_cursor,
     write_delivery_cursor,
     write_read_cursor,
 )
+from .watch import FileWatcher
 
-HEADER_LINE_PATTERN = re.compile(r"^---\s*(claude|codex|user)\s*---\s*$")
+# one `--- source ---` header line. multiline so a whole message can be
+# scanned in one pass; `[^\S\n]` keeps padding from spanning line breaks.
+HEADER_LINE_PATTERN = re.compile(
+    r"^[^\S\n]*---[^\S\n]*(claude|codex|user)[^\S\n]*---[^\S\n]*$",
+    re.MULTILINE,
+)
+
+# bytes fetched per pread while indexing or streaming a session window
+_READ_CHUNK_BYTES = 64 * 1024
+
+# row-type and marker values compared on every scanned row. shared module
+# constants keep scans and index needles spelled identically; the string
+# literals are interned by the compiler, so equality against a value that is
+# the same object short-circuits before comparing characters.
+_USER = "user"
+_ASSISTANT = "assistant"
+_SYSTEM = "system"
+_EVENT_MSG = "event_msg"
+_TASK_STARTED = "task_started"
+_TASK_COMPLETE = "task_complete"
+_TURN_DURATION = "turn_duration"
+_END_TURN = "end_turn"
+
+# raw-text needles indexed per session line. a hit means the row *may* be of
+# interest; scans still decode and check it. rows with no hit for a scan are
+# never read, which keeps marker scans cheap when a window is dominated by
+# large assistant or tool rows.
+_MARKER_NEEDLES = {
+    name: f'"{name}"'.encode()
+    for name in (
+        _TASK_STARTED,
+        _TASK_COMPLETE,
+        _TURN_DURATION,
+        _END_TURN,
+        _USER,
+        _ASSISTANT,
+    )
+}
+_CODEX_TURN_MARKERS = (_TASK_STARTED, _TASK_COMPLETE)
+_CLAUDE_TURN_MARKERS = (_TURN_DURATION, _END_TURN)
+
+
+class RowKind(IntEnum):
+    """Turn-end role of one session row, cached per indexed line.
+
+    Marker scans classify a candidate row once; later scans over the same
+    line compare the cached kind instead of re-reading and re-decoding it.
+    """
+
+    UNCLASSIFIED = 0
+    OTHER = 1
+    CODEX_TASK_STARTED = 2
+    CODEX_TASK_COMPLETE = 3
+    CLAUDE_TURN_DURATION = 4
+    CLAUDE_END_TURN = 5
 
 
 @dataclass
@@ -90,6 +148,180 @@ class StuckCursorState:
     started_at: float
 
 
+@dataclass
+class SessionTailState:
+    """Incremental line index over one append-only JSONL session file.
+
+    Attributes:
+        path: Indexed session file.
+        inode: Inode of the indexed file; a change means the file was replaced.
+        size: File size in bytes observed at the last refresh.
+        mtime_ns: File modification time observed at the last refresh.
+        line_ends: Byte offset just past each newline-terminated line.
+        markers: Sorted line numbers of indexed lines containing each
+            `_MARKER_NEEDLES` entry.
+        kinds: One `RowKind` byte per indexed line, filled lazily by marker
+            scans.
+        stream: Read handle kept open across polls, or None when the file
+            is missing.
+    """
+
+    path: Path
+    inode: int = -1
+    size: int = 0
+    mtime_ns: int = 0
+    line_ends: list[int] = field(default_factory=list)
+    markers: dict[str, list[int]] = field(
+        default_factory=lambda: {name: [] for name in _MARKER_NEEDLES}
+    )
+    kinds: bytearray = field(default_factory=bytearray, repr=False)
+    stream: io.FileIO | None = field(default=None, repr=False)
+
+    @property
+    def indexed_offset(self) -> int:
+        """Byte offset where the unterminated trailing fragment starts."""
+        return self.line_ends[-1] if self.line_ends else 0
+
+    @property
+    def line_count(self) -> int:
+        """Physical line count, including an unterminated trailing fragment."""
+        fragment = 1 if self.size > self.indexed_offset else 0
+        return len(self.line_ends) + fragment
+
+    def reset(self) -> None:
+        """Drop the line index so the file is rescanned from the start."""
+        self.size = 0
+        self.line_ends = []
+        for lines in self.markers.values():
+            lines.clear()
+        self.kinds.clear()
+
+    def index_block(self, block: bytes, block_start: int) -> None:
+        """Index a run of complete lines starting at the indexed offset.
+
+        Args:
+            block: Raw bytes ending with a newline.
+            block_start: File offset of the first byte of `block`.
+        """
+        first_line = len(self.line_ends)
+        relative_ends: list[int] = []
+        newline = block.find(b"\n")
+        while newline != -1:
+            relative_ends.append(newline + 1)
+            newline = block.find(b"\n", newline + 1)
+        self.line_ends.extend(block_start + end for end in relative_ends)
+        self.kinds.extend(bytes(len(relative_ends)))
+
+        # search the whole block once per needle, so the cost tracks needle
+        # hits rather than line count. hits arrive in file order, so every
+        # list stays sorted for bisect lookups
+        for name, needle in _MARKER_NEEDLES.items():
+            lines = self.markers[name]
+            position = block.find(needle)
+            while position != -1:
+                line = bisect.bisect_right(relative_ends, position)
+                lines.append(first_line + line + 1)
+                position = block.find(needle, relative_ends[line])
+
+    def marker_lines(
+        self, names: tuple[str, ...], start_line: int, end_line: int
+    ) -> list[int]:
+        """Return indexed lines in `(start_line, end_line]` matching any name.
+
+        Args:
+            names: `_MARKER_NEEDLES` keys to match.
+            start_line: Starting cursor (exclusive).
+            end_line: Ending cursor (inclusive); clipped to indexed lines.
+
+        Returns:
+            Sorted absolute line numbers.
+        """
+        end_line = min(end_line, len(self.line_ends))
+        if len(names) == 1:
+            return self._marker_slice(names[0], start_line, end_line)
+        lines: set[int] = set()
+        for name in names:
+            lines.update(self._marker_slice(name, start_line, end_line))
+        return sorted(lines)
+
+    def candidate_lines(
+        self, names: tuple[str, ...], start_line: int, end_line: int
+    ) -> list[int]:
+        """Return lines in `(start_line, end_line]` a marker scan must inspect.
+
+        Same as `marker_lines`, plus the unterminated trailing fragment when
+        the window reaches it, since the fragment is not indexed yet.
+
+        Args:
+            names: `_MARKER_NEEDLES` keys to match.
+            start_line: Starting cursor (exclusive).
+            end_line: Ending cursor (inclusive), at most `line_count`.
+
+        Returns:
+            Sorted absolute line numbers.
+        """
+        lines = self.marker_lines(names, start_line, end_line)
+        if end_line == len(self.line_ends) + 1 and end_line > start_line:
+            lines.append(end_line)
+        return lines
+
+    def _marker_slice(self, name: str, start_line: int, end_line: int) -> list[int]:
+        """Return one needle's lines in `(start_line, end_line]` via bisect."""
+        lines = self.markers[name]
+        low = bisect.bisect_right(lines, start_line)
+        high = bisect.bisect_right(lines, end_line, lo=low)
+        return lines[low:high]
+
+    def byte_range(self, start_line: int, end_line: int) -> tuple[int, int]:
+        """Return the byte span covering lines `(start_line, end_line]`.
+
+        Args:
+            start_line: Starting cursor (exclusive).
+            end_line: Ending cursor (inclusive), at most `line_count`.
+
+        Returns:
+            `(start_offset, end_offset)` into the session file.
+        """
+        start_offset = self.line_ends[start_line - 1] if start_line > 0 else 0
+        if end_line <= len(self.line_ends):
+            return start_offset, self.line_ends[end_line - 1]
+        return start_offset, self.size
+
+    def read_line(self, line: int) -> bytes:
+        """Read one raw line through the open handle.
+
+        Args:
+            line: Absolute line number, at most `line_count`.
+
+        Returns:
+            Raw line bytes, keeping the trailing newline when present.
+        """
+        assert self.stream is not None
+        start_offset, end_offset = self.byte_range(line - 1, line)
+        return os.pread(self.stream.fileno(), end_offset - start_offset, start_offset)
+
+    def close(self) -> None:
+        """Release the read handle."""
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+
+@dataclass
+class DebugLogTail:
+    """Read position in one Claude debug log.
+
+    Attributes:
+        path: Tailed debug log.
+        inode: Inode of the tailed file; a change means the log was rotated.
+        offset: Byte offset just past the last complete line consumed.
+    """
+
+    path: Path
+    inode: int = -1
+    offset: int = 0
+
+
 @dataclass
 class TurnEndScan:
     """Result of scanning one JSONL window for a deterministic turn-end marker."""
@@ -127,12 +359,35 @@ class Router:
         self.config = config
         self._warning_callback = warning_callback
         self._stuck_state: dict[str, StuckCursorState] = {}
-        # byte offset into the claude debug log to avoid re-reading from the start
-        self._debug_log_offset: int = 0
+        # per-agent line index so polls only scan bytes appended since the
+        # previous refresh instead of re-reading the whole session file
+        self._tails: dict[str, SessionTailState] = {}
+        # last refresh_source extraction per agent, keyed by the session file
+        # signature and read cursor. a stalled cursor (malformed or partially
+        # written tail) re-polls an unchanged window, which is served from here
+        self._extraction_cache: dict[str, tuple[tuple, dict]] = {}
+        # read position in the claude debug log to avoid re-reading from the start
+        self._debug_tail: DebugLogTail | None = None
         # latched stop-event flags for poll_for_response, keyed by
         # (target_agent, before_cursor) to survive across idle polls
         self._poll_stop_seen: set[tuple[str, int]] = set()
         self._stop_event_re = re.compile(CLAUDE_STOP_EVENT_RE)
+        # created on first blocking wait so non-blocking callers never hold
+        # an inotify descriptor
+        self._watcher: FileWatcher | None = None
+
+    def close(self) -> None:
+        """Release session file handles and the file watcher.
+
+        Handles are reopened on demand, so the router stays usable afterwards.
+        """
+        for tail in self._tails.values():
+            tail.close()
+        self._tails.clear()
+        self._extraction_cache.clear()
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
 
     def refresh_source(self, source_agent: str) -> int:
         """Advance source read cursor by parsing newly appended lines.
@@ -148,7 +403,8 @@ class Router:
         """
         participant = self.participants.for_agent(source_agent)
         cursor = read_read_cursor(self.workspace_root, source_agent)
-        line_count = count_lines(participant.session_file)
+        tail = self._refresh_tail(participant)
+        line_count = tail.line_count
         if cursor > line_count:
             raise ClaodexError(
                 f"read cursor {cursor} exceeds {source_agent} session length {line_count}"
@@ -158,15 +414,21 @@ class Router:
             self._stuck_state.pop(source_agent, None)
             return cursor
 
-        delta_lines = read_lines_between(
-            participant.session_file, start_line=cursor, end_line=line_count
-        )
-        extraction = extract_room_events_from_window(
-            source=source_agent,
-            delta_lines=delta_lines,
-            agent_participant=source_agent,
-            start_line=cursor,
-        )
+        cache_key = (tail.path, tail.inode, tail.mtime_ns, tail.size, cursor)
+        cached = self._extraction_cache.get(source_agent)
+        if cached is not None and cached[0] == cache_key:
+            extraction = cached[1]
+        else:
+            delta_lines = self._session_lines_between(
+                participant, start_line=cursor, end_line=line_count
+            )
+            extraction = extract_room_events_from_window(
+                source=source_agent,
+                delta_lines=delta_lines,
+                agent_participant=source_agent,
+                start_line=cursor,
+            )
+            self._extraction_cache[source_agent] = (cache_key, extraction)
         next_cursor = extraction["last_success_line"]
         if next_cursor < cursor:
             raise ClaodexError("validation error: read cursor cannot move backward")
@@ -201,6 +463,198 @@ class Router:
             self._emit_warning(warning)
         return next_cursor
 
+    def _refresh_tail(self, participant: Participant) -> SessionTailState:
+        """Index lines appended to a participant session file since last call.
+
+        The index is rebuilt from scratch when the session file is swapped,
+        replaced (inode change), or truncated. An unchanged file costs one
+        `stat` call.
+
+        Args:
+            participant: Participant whose session file should be indexed.
+
+        Returns:
+            Up-to-date tail state for the participant session file.
+        """
+        path = participant.session_file
+        tail = self._tails.get(participant.agent)
+        if tail is None or tail.path != path:
+            if tail is not None:
+                tail.close()
+            tail = SessionTailState(path=path)
+            self._tails[participant.agent] = tail
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            tail.close()
+            tail.inode = -1
+            tail.mtime_ns = 0
+            tail.reset()
+            return tail
+
+        if stat.st_ino != tail.inode or tail.stream is None:
+            # first sight or replaced file: reopen once, then keep the handle
+            # so later polls read through pread without open/close pairs
+            tail.close()
+            try:
+                tail.stream = io.FileIO(path, "rb")
+            except FileNotFoundError:
+                return tail
+            tail.inode = os.fstat(tail.stream.fileno()).st_ino
+            tail.reset()
+        elif stat.st_size < tail.size:
+            tail.reset()
+        tail.mtime_ns = stat.st_mtime_ns
+        if stat.st_size == tail.size:
+            return tail
+
+        # rescan from the start of the trailing fragment so a line that was
+        # partially written at the previous refresh is indexed once complete.
+        # bounded chunks keep indexing a large existing session from copying
+        # it into one python bytes object.
+        descriptor = tail.stream.fileno()
+        offset = tail.indexed_offset
+        pending = b""
+        while offset < stat.st_size:
+            chunk = os.pread(
+                descriptor, min(_READ_CHUNK_BYTES, stat.st_size - offset), offset
+            )
+            if not chunk:
+                # truncated since stat; the next refresh resets the index
+                break
+            offset += len(chunk)
+            pending += chunk
+            last_newline = pending.rfind(b"\n")
+            if last_newline == -1:
+                continue
+            tail.index_block(pending[: last_newline + 1], offset - len(pending))
+            pending = pending[last_newline + 1 :]
+        tail.size = offset
+        return tail
+
+    def _session_lines_between(
+        self,
+        participant: Participant,
+        start_line: int,
+        end_line: int,
+    ) -> list[str]:
+        """Read session lines in one window using the incremental line index.
+
+        Only the byte range covering the requested window is read from disk.
+
+        Args:
+            participant: Participant whose session file should be read.
+            start_line: Starting cursor (exclusive).
+            end_line: Ending cursor (inclusive).
+
+        Returns:
+            Raw file lines, each keeping its trailing newline when present.
+        """
+        tail = self._refresh_tail(participant)
+        end_line = min(end_line, tail.line_count)
+        if end_line <= start_line or tail.stream is None:
+            return []
+
+        start_offset, end_offset = tail.byte_range(start_line, end_line)
+        data = os.pread(
+            tail.stream.fileno(), end_offset - start_offset, start_offset
+        )
+        if not data:
+            return []
+
+        # utf-8 never encodes other characters with a 0x0a byte, so splitting
+        # the decoded text on "\n" matches the byte-level line index
+        lines = [
+            f"{line}\n"
+            for line in data.decode("utf-8", errors="replace").split("\n")
+        ]
+        if lines[-1] == "\n":
+            lines.pop()
+        else:
+            lines[-1] = lines[-1][:-1]
+        return lines
+
+    def _iter_session_rows(
+        self,
+        participant: Participant,
+        start_line: int,
+        end_line: int,
+        *,
+        markers: tuple[str, ...],
+    ) -> Iterator[tuple[int, dict]]:
+        """Stream decoded candidate rows from one window, one line at a time.
+
+        Lines are read and decoded lazily, so a scan that stops early never
+        touches the rest of the window and only one row is held in memory.
+
+        Args:
+            participant: Participant whose session file should be read.
+            start_line: Starting cursor (exclusive).
+            end_line: Ending cursor (inclusive).
+            markers: `_MARKER_NEEDLES` keys; only lines indexed under one of
+                them (plus a matching unterminated tail) are read.
+
+        Yields:
+            `(absolute_line, entry)` for each candidate JSON object row in the
+            window. Blank, malformed, and non-object rows are skipped.
+        """
+        tail = self._refresh_tail(participant)
+        end_line = min(end_line, tail.line_count)
+        if end_line <= start_line or tail.stream is None:
+            return
+
+        indexed_lines = len(tail.line_ends)
+        for absolute_line in tail.candidate_lines(markers, start_line, end_line):
+            raw = tail.read_line(absolute_line)
+            if absolute_line > indexed_lines and not _has_marker(raw, markers):
+                continue
+            entry = _parse_jsonl_entry(raw.decode("utf-8", errors="replace"))
+            if entry is not None:
+                yield absolute_line, entry
+
+    def _iter_marker_kinds(
+        self,
+        participant: Participant,
+        start_line: int,
+        end_line: int,
+        markers: tuple[str, ...],
+    ) -> Iterator[tuple[int, RowKind]]:
+        """Yield turn-end marker rows in one window by cached row kind.
+
+        Candidate rows are decoded and classified on first sight; indexed
+        rows keep their kind, so re-scanning a window (as every idle
+        `poll_for_response` does from `before_cursor`) reads nothing new.
+
+        Args:
+            participant: Participant whose session file should be read.
+            start_line: Starting cursor (exclusive).
+            end_line: Ending cursor (inclusive).
+            markers: `_MARKER_NEEDLES` keys selecting candidate rows.
+
+        Yields:
+            `(absolute_line, kind)` for every candidate that is not `OTHER`.
+        """
+        tail = self._refresh_tail(participant)
+        end_line = min(end_line, tail.line_count)
+        if end_line <= start_line or tail.stream is None:
+            return
+
+        indexed_lines = len(tail.line_ends)
+        for absolute_line in tail.candidate_lines(markers, start_line, end_line):
+            indexed = absolute_line <= indexed_lines
+            kind = tail.kinds[absolute_line - 1] if indexed else RowKind.UNCLASSIFIED
+            if kind == RowKind.UNCLASSIFIED:
+                raw = tail.read_line(absolute_line)
+                if not indexed and not _has_marker(raw, markers):
+                    continue
+                entry = _parse_jsonl_entry(raw.decode("utf-8", errors="replace"))
+                kind = RowKind.OTHER if entry is None else _classify_marker_row(entry)
+                if indexed:
+                    tail.kinds[absolute_line - 1] = kind
+            if kind != RowKind.OTHER:
+                yield absolute_line, RowKind(kind)
+
     def _emit_warning(self, message: str) -> None:
         """Emit a non-fatal router warning."""
         if self._warning_callback is not None:
@@ -220,8 +674,8 @@ class Router:
             Extracted room events in source order.
         """
         participant = self.participants.for_agent(source_agent)
-        delta_lines = read_lines_between(
-            participant.session_file,
+        delta_lines = self._session_lines_between(
+            participant,
             start_line=start_line,
             end_line=end_line,
         )
@@ -503,6 +957,17 @@ class Router:
         # the deadline, the terminal error below distinguishes this case.
         saw_orphan_turn_end_marker = False
 
+        # wake as soon as the target session (or the claude debug log) is
+        # written instead of always sleeping out the full poll interval. one
+        # watcher covers every session file, so only target paths end a wait
+        wake_paths = [participant.session_file]
+        if target_agent == "claude":
+            wake_paths.append(self._claude_debug_log_path(participant))
+        if self._watcher is None:
+            self._watcher = FileWatcher()
+        for path in wake_paths:
+            self._watcher.watch(path)
+
         while time.monotonic() < deadline:
             self._ensure_target_alive(participant)
             current_cursor = self.refresh_source(target_agent)
@@ -584,7 +1049,10 @@ class Router:
                             received_at=datetime.now(timezone.utc),
                         )
 
-            time.sleep(self.config.poll_seconds)
+            self._watcher.wait(
+                min(self.config.poll_seconds, deadline - time.monotonic()),
+                paths=wake_paths,
+            )
 
         marker_label = self._turn_end_marker_label(target_agent)
         saw_assistant_output = False
@@ -756,31 +1224,13 @@ class Router:
         """
         saw_started = False
         first_complete_without_started: int | None = None
-        lines = read_lines_between(
-            participant.session_file, start_line=start_line, end_line=end_line
+        rows = self._iter_marker_kinds(
+            participant, start_line, end_line, markers=_CODEX_TURN_MARKERS
         )
-        for offset, raw_line in enumerate(lines, start=1):
-            absolute_line = start_line + offset
-            raw_line = raw_line.strip()
-            if not raw_line:
-                continue
-            try:
-                entry = json.loads(raw_line)
-            except json.JSONDecodeError:
-                continue
-            if not isinstance(entry, dict):
-                continue
-            if entry.get("type") != "event_msg":
-                continue
-
-            payload = entry.get("payload", {})
-            if not isinstance(payload, dict):
-                continue
-
-            marker = payload.get("type")
-            if marker == "task_started":
+        for absolute_line, kind in rows:
+            if kind == RowKind.CODEX_TASK_STARTED:
                 saw_started = True
-            elif marker == "task_complete":
+            elif kind == RowKind.CODEX_TASK_COMPLETE:
                 if saw_started:
                     return TurnEndScan(
                         marker_line=absolute_line, saw_codex_task_started=True
@@ -829,37 +1279,13 @@ class Router:
         Returns:
             Scan result. Marker line is the last turn-end marker in the window.
         """
-        lines = read_lines_between(
-            participant.session_file, start_line=start_line, end_line=end_line
+        rows = self._iter_marker_kinds(
+            participant, start_line, end_line, markers=_CLAUDE_TURN_MARKERS
         )
         last_marker_line: int | None = None
-        for offset, raw_line in enumerate(lines, start=1):
-            absolute_line = start_line + offset
-            raw_line = raw_line.strip()
-            if not raw_line:
-                continue
-            try:
-                entry = json.loads(raw_line)
-            except json.JSONDecodeError:
-                continue
-            if not isinstance(entry, dict):
-                continue
-
-            # legacy marker: system.turn_duration (Claude Code <= v2.1.61)
-            if (
-                entry.get("type") == "system"
-                and entry.get("subtype") == "turn_duration"
-            ):
+        for absolute_line, kind in rows:
+            if kind in (RowKind.CLAUDE_TURN_DURATION, RowKind.CLAUDE_END_TURN):
                 last_marker_line = absolute_line
-                continue
-
-            # new marker: assistant stop_reason == "end_turn" (Claude Code >= v2.1.77)
-            if entry.get("isSidechain") or entry.get("isMeta"):
-                continue
-            if entry.get("type") == "assistant":
-                message = entry.get("message", {})
-                if isinstance(message, dict) and message.get("stop_reason") == "end_turn":
-                    last_marker_line = absolute_line
 
         return TurnEndScan(marker_line=last_marker_line)
 
@@ -870,7 +1296,9 @@ class Router:
     ) -> bool:
         """Check the claude debug log for a Stop event after send_time.
 
-        Reads from a stored byte offset to avoid re-scanning the whole file.
+        Reads only complete lines appended since the previous call. A
+        partially written last line is left for the next call, so a Stop line
+        split across writes is still matched once it is complete.
 
         Args:
             participant: Claude participant metadata.
@@ -889,28 +1317,35 @@ class Router:
             microsecond=(send_time.microsecond // 1000) * 1000
         )
 
-        debug_path = Path(
-            CLAUDE_DEBUG_LOG_PATTERN.format(session_id=participant.session_id)
-        ).expanduser()
-        if not debug_path.exists():
-            return False
+        debug_path = self._claude_debug_log_path(participant)
+        tail = self._debug_tail
+        if tail is None or tail.path != debug_path:
+            tail = DebugLogTail(path=debug_path)
+            self._debug_tail = tail
 
         try:
-            file_size = debug_path.stat().st_size
-            # reset offset if file was truncated or rotated
-            if file_size < self._debug_log_offset:
-                self._debug_log_offset = 0
-            with debug_path.open("r", encoding="utf-8", errors="replace") as fh:
-                fh.seek(self._debug_log_offset)
-                new_content = fh.read()
-                self._debug_log_offset = fh.tell()
+            stat = debug_path.stat()
+            # restart from the top if the log was rotated or truncated
+            if stat.st_ino != tail.inode or stat.st_size < tail.offset:
+                tail.inode = stat.st_ino
+                tail.offset = 0
+            if stat.st_size == tail.offset:
+                return False
+            with debug_path.open("rb") as fh:
+                fh.seek(tail.offset)
+                appended = fh.read(stat.st_size - tail.offset)
         except OSError:
             return False
 
-        if not new_content:
+        complete_end = appended.rfind(b"\n") + 1
+        if complete_end == 0:
+            return False
+        tail.offset += complete_end
+        appended = appended[:complete_end]
+        if CLAUDE_STOP_EVENT_NEEDLE not in appended:
             return False
 
-        for line in new_content.splitlines():
+        for line in appended.decode("utf-8", errors="replace").splitlines():
             match = self._stop_event_re.match(line)
             if match is None:
                 continue
@@ -924,6 +1359,12 @@ class Router:
                 return True
         return False
 
+    def _claude_debug_log_path(self, participant: Participant) -> Path:
+        """Return the Claude debug log path for one participant session."""
+        return Path(
+            CLAUDE_DEBUG_LOG_PATTERN.format(session_id=participant.session_id)
+        ).expanduser()
+
     def _detect_interference(
         self,
         participant: Participant,
@@ -947,25 +1388,14 @@ class Router:
         Returns:
             A snippet of the interfering user text, or None if clean.
         """
-        lines = read_lines_between(
-            participant.session_file,
-            start_line=before_cursor,
-            end_line=current_cursor,
+        rows = self._iter_session_rows(
+            participant, before_cursor, current_cursor, markers=(_USER,)
         )
 
         normalized_sent = _normalize_for_anchor(sent_text)
         anchor_found = False
-        for raw_line in lines:
-            raw_line = raw_line.strip()
-            if not raw_line:
-                continue
-            try:
-                entry = json.loads(raw_line)
-            except json.JSONDecodeError:
-                continue
-            if not isinstance(entry, dict):
-                continue
-            if entry.get("type") != "user":
+        for _, entry in rows:
+            if entry.get("type") != _USER:
                 continue
 
             message = entry.get("message", {})
@@ -1049,26 +1479,12 @@ class Router:
         treated as a staleness boundary so that only assistant text produced
         after the last user input is returned.
         """
-        lines = read_lines_between(
-            participant.session_file,
-            start_line=start_line,
-            end_line=end_line,
-        )
-
         latest_user_boundary_line = start_line
         latest_assistant_text: str | None = None
 
-        for offset, raw_line in enumerate(lines, start=1):
-            absolute_line = start_line + offset
-            raw_line = raw_line.strip()
-            if not raw_line:
-                continue
-            try:
-                entry = json.loads(raw_line)
-            except json.JSONDecodeError:
-                continue
-            if not isinstance(entry, dict):
-                continue
+        for absolute_line, entry in self._iter_session_rows(
+            participant, start_line, end_line, markers=(_USER, _ASSISTANT)
+        ):
             if entry.get("isSidechain") or entry.get("isMeta"):
                 continue
 
@@ -1080,12 +1496,12 @@ class Router:
             # produce a fresh response after it, so prior text is stale.
             # this is intentionally unconditional: empty, meta-only, and
             # tool_result user rows all invalidate earlier assistant text
-            if entry_type == "user" and role == "user":
+            if entry_type == _USER and role == _USER:
                 latest_user_boundary_line = absolute_line
                 latest_assistant_text = None
                 continue
 
-            if entry_type != "assistant" or role != "assistant":
+            if entry_type != _ASSISTANT or role != _ASSISTANT:
                 continue
             if absolute_line <= latest_user_boundary_line:
                 continue
@@ -1118,6 +1534,72 @@ class Router:
             )
 
 
+def _has_marker(raw: bytes, names: tuple[str, ...]) -> bool:
+    """Return True when a raw row contains any named `_MARKER_NEEDLES` entry."""
+    for name in names:
+        if _MARKER_NEEDLES[name] in raw:
+            return True
+    return False
+
+
+def _classify_marker_row(entry: dict) -> RowKind:
+    """Classify one decoded session row by its turn-end role.
+
+    Args:
+        entry: Decoded JSONL object.
+
+    Returns:
+        Marker kind, or `RowKind.OTHER` for rows that end no turn.
+    """
+    entry_type = entry.get("type")
+    if entry_type == _EVENT_MSG:
+        payload = entry.get("payload")
+        if isinstance(payload, dict):
+            marker = payload.get("type")
+            if marker == _TASK_STARTED:
+                return RowKind.CODEX_TASK_STARTED
+            if marker == _TASK_COMPLETE:
+                return RowKind.CODEX_TASK_COMPLETE
+        return RowKind.OTHER
+
+    # legacy marker: system.turn_duration (Claude Code <= v2.1.61)
+    if entry_type == _SYSTEM:
+        if entry.get("subtype") == _TURN_DURATION:
+            return RowKind.CLAUDE_TURN_DURATION
+        return RowKind.OTHER
+
+    # new marker: assistant stop_reason == "end_turn" (Claude Code >= v2.1.77)
+    if entry_type != _ASSISTANT:
+        return RowKind.OTHER
+    if entry.get("isSidechain") or entry.get("isMeta"):
+        return RowKind.OTHER
+    message = entry.get("message")
+    if isinstance(message, dict) and message.get("stop_reason") == _END_TURN:
+        return RowKind.CLAUDE_END_TURN
+    return RowKind.OTHER
+
+
+def _parse_jsonl_entry(raw_line: str) -> dict | None:
+    """Decode one JSONL row.
+
+    Args:
+        raw_line: Raw session file line.
+
+    Returns:
+        Parsed object, or None for blank, malformed, or non-object rows.
+    """
+    raw_line = raw_line.strip()
+    if not raw_line:
+        return None
+    try:
+        entry = json.loads(raw_line)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(entry, dict):
+        return None
+    return entry
+
+
 def _normalize_for_anchor(text: str) -> str:
     """Normalize text for anchor comparison.
 
@@ -1184,35 +1666,17 @@ def strip_injected_context(message: str) -> str:
     if not text.startswith("---"):
         return message
 
-    lines = text.splitlines()
-    blocks: list[tuple[str, list[str]]] = []
-    current_source: str | None = None
-    current_lines: list[str] = []
-
-    for line in lines:
-        header_match = HEADER_LINE_PATTERN.match(line.strip())
-        if header_match:
-            if current_source is not None:
-                blocks.append((current_source, current_lines))
-            current_source = header_match.group(1)
-            current_lines = []
-            continue
-
-        if current_source is None:
-            return message
-        current_lines.append(line)
-
-    if current_source is None:
-        return message
-    blocks.append((current_source, current_lines))
-
-    if not blocks:
+    headers = list(HEADER_LINE_PATTERN.finditer(text))
+    if not headers or headers[0].start() != 0:
+        # text before the first header means this is not claodex block shape
         return message
 
-    for source, body_lines in reversed(blocks):
-        if source != "user":
+    # each block body runs from the end of its header to the next header
+    body_ends = [header.start() for header in headers[1:]] + [len(text)]
+    for header, body_end in zip(reversed(headers), reversed(body_ends)):
+        if header.group(1) != "user":
             continue
-        body = "\n".join(body_lines).strip()
+        body = text[header.end() : body_end].strip()
         if body:
             return body
     # message has valid claodex headers but no user block — this is a routed
@@ -3,17 +3,20 @@
 from __future__ import annotations
 
 import curses
+import functools
+import io
+import itertools
 import json
+import os
 import shlex
 import subprocess
 import sys
-import textwrap
 import time
 from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable, Iterator
 
 from .state import ui_events_file, ui_metrics_file
 
@@ -23,7 +26,17 @@ LOG_BUFFER_MAX = 4000
 SHELL_TIMEOUT_SECONDS = 30
 SHELL_MAX_LINES = 100
 SHELL_MAX_BYTES = 10 * 1024
-INTERACTIVE_COMMANDS = frozenset({"vim", "nvim", "nano", "less", "more", "top", "htop"})
+# full-screen programs that always take over the terminal; REPLs such as
+# python or psql are left out because they also run scripts non-interactively
+INTERACTIVE_COMMANDS = frozenset({"vi", "vim", "nvim", "nano", "emacs", "less", "more", "top", "htop"})
+# characters that make shlex tokenization differ from a plain whitespace split
+_SHELL_QUOTING_CHARS = frozenset("\"'\\")
+# quoted key names every event row must contain; ui.py writes them verbatim
+_EVENT_KEYS = ('"ts"', '"kind"', '"message"')
+_decode_event_json = json.JSONDecoder().decode
+# entry and render clocks are only read back as epoch seconds, so an aware
+# UTC now skips the per-call local timezone lookup of astimezone()
+_utc_now = functools.partial(datetime.now, timezone.utc)
 LOG_PAGE_SCROLL_LINES = 3
 # gap rotates clockwise: top-right → down-right → bottom → up-left → top
 SPINNER_FRAMES = ("⣷", "⣯", "⣟", "⡿", "⢿", "⣻", "⣽", "⣾")
@@ -36,9 +49,12 @@ PAIR_SYSTEM = 5
 PAIR_MODE = 6
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LogEntry:
-    """One sidebar log entry."""
+    """One sidebar log entry.
+
+    Slotted because the sidebar buffers up to `LOG_BUFFER_MAX` entries.
+    """
 
     timestamp: datetime
     kind: str
@@ -61,14 +77,29 @@ class SidebarApplication:
         self._metrics_path = ui_metrics_file(workspace_root)
         self._metrics = _default_metrics_snapshot()
         self._entries: deque[LogEntry] = deque(maxlen=LOG_BUFFER_MAX)
+        # parallel columns for the per-frame aggregates; every deque shares
+        # LOG_BUFFER_MAX, so evictions keep them aligned with _entries
+        self._entry_kinds: deque[str] = deque(maxlen=LOG_BUFFER_MAX)
+        self._entry_agents: deque[str | None] = deque(maxlen=LOG_BUFFER_MAX)
+        self._entry_seconds: deque[float] = deque(maxlen=LOG_BUFFER_MAX)
+        self._entry_version: int = 0
+        # recv counts over the buffered rows, maintained on append/evict
+        self._turn_counts: dict[str, int] = {"claude": 0, "codex": 0}
+        # (entry version, total) from the last completed-thinking scan
+        self._completed_thinking: tuple[int, float] = (0, 0.0)
         self._input_buffer: str = ""
         self._event_offset: int = 0
-        self._event_fragment: str = ""
+        self._event_fragment: bytes = b""
+        # kept open across ticks and read with pread; reopened on inode change
+        self._event_stream: io.FileIO | None = None
+        self._event_inode: int | None = None
         self._last_metrics_poll: float = 0.0
+        # (inode, mtime_ns, size) of the last decoded metrics file
+        self._metrics_signature: tuple[int, int, int] | None = None
         self._scroll_offset: int = 0
         self._last_log_height: int = 1
         self._colors_enabled = False
-        self._spinner_index: int = 0
+        self._spinner_frames: Iterator[str] = itertools.cycle(SPINNER_FRAMES)
 
     def run(self) -> int:
         """Run sidebar app until interrupted."""
@@ -77,6 +108,8 @@ class SidebarApplication:
             curses.wrapper(self._curses_main)
         except KeyboardInterrupt:
             return 0
+        finally:
+            self._close_event_stream()
         return 0
 
     def _curses_main(self, stdscr: "curses._CursesWindow") -> None:
@@ -135,6 +168,16 @@ class SidebarApplication:
         if now - self._last_metrics_poll < METRICS_POLL_SECONDS:
             return
         self._last_metrics_poll = now
+        try:
+            stat = self._metrics_path.stat()
+        except OSError:
+            return
+        # the writer replaces the file atomically, so the inode changes on
+        # every update even when mtime granularity is coarse
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature == self._metrics_signature:
+            return
+        self._metrics_signature = signature
         self._metrics = _load_metrics_snapshot(self._metrics_path, self._metrics)
 
     def _poll_events(self) -> None:
@@ -142,44 +185,61 @@ class SidebarApplication:
         for raw_line in self._read_event_lines():
             entry = _parse_event_line(raw_line)
             if entry is not None:
-                self._entries.append(entry)
+                self._append_entry(entry)
 
     def _read_event_lines(self) -> list[str]:
-        """Read newly appended lines from the event file."""
-        if not self._events_path.exists():
-            return []
-
+        """Read newly appended lines from the event file.
+
+        One `stat` gates each call, so an idle tick reads nothing. The file
+        stays open across calls and new bytes are fetched with `os.pread`
+        from the tracked offset; a replaced (new inode) or truncated file is
+        re-read from the start. An unterminated trailing fragment is kept as
+        bytes, so a multi-byte character split across writes is decoded only
+        once complete.
+        """
         try:
-            file_size = self._events_path.stat().st_size
+            stat = self._events_path.stat()
         except OSError:
             return []
 
-        if file_size < self._event_offset:
+        if stat.st_ino != self._event_inode or self._event_stream is None:
+            self._close_event_stream()
+            try:
+                self._event_stream = io.FileIO(self._events_path, "rb")
+            except OSError:
+                return []
+            if self._event_inode is not None and stat.st_ino != self._event_inode:
+                self._event_offset = 0
+                self._event_fragment = b""
+            self._event_inode = stat.st_ino
+        if stat.st_size < self._event_offset:
             self._event_offset = 0
-            self._event_fragment = ""
+            self._event_fragment = b""
+        if stat.st_size == self._event_offset:
+            return []
 
         try:
-            with self._events_path.open("r", encoding="utf-8", errors="replace") as handle:
-                handle.seek(self._event_offset)
-                chunk = handle.read()
-                self._event_offset = handle.tell()
+            chunk = os.pread(
+                self._event_stream.fileno(),
+                stat.st_size - self._event_offset,
+                self._event_offset,
+            )
         except OSError:
             return []
-
-        if not chunk:
-            return []
+        self._event_offset += len(chunk)
 
         data = self._event_fragment + chunk
-        lines: list[str] = []
-        self._event_fragment = ""
-
-        for part in data.splitlines(keepends=True):
-            if part.endswith("\n"):
-                lines.append(part.rstrip("\n"))
-            else:
-                self._event_fragment = part
+        complete_end = data.rfind(b"\n") + 1
+        self._event_fragment = data[complete_end:]
+        if complete_end == 0:
+            return []
+        return data[: complete_end - 1].decode("utf-8", errors="replace").split("\n")
 
-        return lines
+    def _close_event_stream(self) -> None:
+        """Release the event file handle."""
+        if self._event_stream is not None:
+            self._event_stream.close()
+            self._event_stream = None
 
     def _handle_input_key(self, key: str | int) -> None:
         """Update shell input buffer or run command."""
@@ -263,14 +323,42 @@ class SidebarApplication:
 
     def _append_shell_entry(self, message: str) -> None:
         """Append one shell-local log entry."""
-        self._entries.append(
+        self._append_entry(
             LogEntry(
-                timestamp=datetime.now().astimezone(),
+                timestamp=_utc_now(),
                 kind="shell",
                 message=message,
             )
         )
 
+    def _append_entry(self, entry: LogEntry) -> None:
+        """Append one log entry and its aggregate columns."""
+        if len(self._entry_kinds) == self._entry_kinds.maxlen:
+            # the append below evicts the oldest row from every column
+            self._count_turn(self._entry_kinds[0], self._entry_agents[0], -1)
+        agent = _entry_agent(entry)
+        self._count_turn(entry.kind, agent, 1)
+        self._entries.append(entry)
+        self._entry_kinds.append(entry.kind)
+        self._entry_agents.append(agent)
+        self._entry_seconds.append(entry.timestamp.timestamp())
+        self._entry_version += 1
+
+    def _count_turn(self, kind: str, agent: str | None, delta: int) -> None:
+        """Adjust the running turn count for one recv row."""
+        if kind == "recv" and agent in self._turn_counts:
+            self._turn_counts[agent] += delta
+
+    def _completed_thinking_seconds(self) -> float:
+        """Return completed thinking time, rescanning only after appends."""
+        version, total = self._completed_thinking
+        if version != self._entry_version:
+            total = _sum_completed_thinking(
+                self._entry_kinds, self._entry_agents, self._entry_seconds
+            )
+            self._completed_thinking = (self._entry_version, total)
+        return total
+
     def _render(self, stdscr: "curses._CursesWindow") -> None:
         """Render all sidebar sections."""
         stdscr.erase()
@@ -279,7 +367,7 @@ class SidebarApplication:
             stdscr.refresh()
             return
 
-        now = datetime.now().astimezone()
+        now = _utc_now()
         self._render_metrics_strip(stdscr, row=0, width=width, now=now)
 
         metrics_separator_row = 1
@@ -311,11 +399,10 @@ class SidebarApplication:
         if row < 0:
             return
 
-        spinner_frame = SPINNER_FRAMES[self._spinner_index]
-        self._spinner_index = (self._spinner_index + 1) % len(SPINNER_FRAMES)
+        spinner_frame = next(self._spinner_frames)
 
-        turn_counts = _derive_turn_counts(self._entries)
-        thinking_total = _derive_completed_thinking_seconds(self._entries) + _derive_inflight_thinking_seconds(
+        turn_counts = self._turn_counts
+        thinking_total = self._completed_thinking_seconds() + _derive_inflight_thinking_seconds(
             self._metrics, now=now
         )
         status_text, thinking_agent = _status_text(self._metrics, spinner_frame=spinner_frame)
@@ -413,17 +500,18 @@ class SidebarApplication:
         )
         thumb_bottom = thumb_top + thumb_size
 
+        # bind once per draw; ACS_VLINE only exists after initscr(), so it
+        # cannot be captured at import time
+        vline = curses.ACS_VLINE
+        track_attr = curses.A_DIM
+        thumb_attr = curses.A_BOLD
+        error = curses.error
         for offset in range(height):
-            row = top + offset
+            attr = thumb_attr if thumb_top <= offset < thumb_bottom else track_attr
             try:
-                stdscr.addch(row, column, curses.ACS_VLINE, curses.A_DIM)
-            except curses.error:
+                stdscr.addch(top + offset, column, vline, attr)
+            except error:
                 continue
-            if thumb_top <= offset < thumb_bottom:
-                try:
-                    stdscr.addch(row, column, curses.ACS_VLINE, curses.A_BOLD)
-                except curses.error:
-                    continue
 
     def _render_shell_input(self, stdscr: "curses._CursesWindow", *, row: int, width: int) -> None:
         """Render shell prompt and move cursor."""
@@ -452,11 +540,9 @@ class SidebarApplication:
         """
         wrapped: list[tuple[str, int]] = []
         for entry in self._entries:
-            timestamp = entry.timestamp.astimezone().strftime("%H:%M:%S")
-            kind_padding = " " * max(0, 6 - len(entry.kind))
-            kind_block = f"{kind_padding}[{entry.kind}]"
-            prefix = f"{timestamp} {kind_block} "
-            continuation_prefix = " " * len(prefix)
+            prefix, continuation_prefix = _log_prefixes(
+                int(entry.timestamp.timestamp()), entry.kind
+            )
             wrap_width = max(1, width - len(prefix))
             attr = self._entry_attr(entry)
 
@@ -465,15 +551,7 @@ class SidebarApplication:
             logical_lines = entry.message.split("\n")
             first = True
             for logical_line in logical_lines:
-                chunks = textwrap.wrap(
-                    logical_line,
-                    width=wrap_width,
-                    replace_whitespace=False,
-                    drop_whitespace=False,
-                )
-                if not chunks:
-                    chunks = [""]
-                for chunk in chunks:
+                for chunk in _wrap_line(logical_line, wrap_width):
                     if first:
                         wrapped.append((f"{prefix}{chunk}", attr))
                         first = False
@@ -546,13 +624,16 @@ class SidebarApplication:
         width: int,
         segments: list[tuple[str, int]],
     ) -> None:
-        """Draw one row from colored text segments."""
+        """Draw one row from colored text segments.
+
+        Adjacent segments sharing an attribute are drawn with one `addnstr`.
+        """
         if row < 0:
             return
         max_width = max(0, width - 1)
         column = 0
-        for text, attr in segments:
-            if not text or column >= max_width:
+        for text, attr in _coalesce_segments(segments):
+            if column >= max_width:
                 break
             remaining = max_width - column
             clipped = text[:remaining]
@@ -563,11 +644,67 @@ class SidebarApplication:
             column += len(clipped)
 
 
+def _coalesce_segments(segments: Iterable[tuple[str, int]]) -> list[tuple[str, int]]:
+    """Join adjacent same-attribute segments, stopping at the first empty one."""
+    merged: list[tuple[str, int]] = []
+    for text, attr in segments:
+        if not text:
+            break
+        if merged and merged[-1][1] == attr:
+            merged[-1] = (merged[-1][0] + text, attr)
+        else:
+            merged.append((text, attr))
+    return merged
+
+
+def _wrap_line(text: str, width: int) -> list[str]:
+    """Wrap one logical line to at most `width` characters per chunk.
+
+    Breaks at the last space that fits, dropping that space, and hard-breaks
+    words longer than the width. Unlike `textwrap.wrap`, this is a plain
+    `str.rfind` loop with no per-call regex chunking, and a line that already
+    fits is returned as-is.
+
+    Args:
+        text: Line without embedded newlines.
+        width: Maximum chunk width; must be positive.
+
+    Returns:
+        Wrapped chunks; an empty line yields one empty chunk.
+    """
+    if "\t" in text:
+        text = text.expandtabs()
+    if len(text) <= width:
+        return [text]
+
+    chunks: list[str] = []
+    start = 0
+    length = len(text)
+    while length - start > width:
+        end = start + width
+        # a space right at `end` still lets a full-width chunk fit
+        cut = text.rfind(" ", start, end + 1)
+        if cut <= start:
+            chunks.append(text[start:end])
+            start = end
+        else:
+            chunks.append(text[start:cut])
+            start = cut + 1
+    chunks.append(text[start:])
+    return chunks
+
+
 def _parse_event_line(raw_line: str) -> LogEntry | None:
-    """Parse one JSONL event line into a sidebar log entry."""
+    """Parse one JSONL event line into a sidebar log entry.
+
+    Rows missing a required key name are rejected by substring checks before
+    decoding, and the rest go straight to a shared `JSONDecoder`.
+    """
+    if not all(key in raw_line for key in _EVENT_KEYS):
+        return None
     try:
-        payload = json.loads(raw_line)
-    except json.JSONDecodeError:
+        payload = _decode_event_json(raw_line)
+    except ValueError:
         return None
     if not isinstance(payload, dict):
         return None
@@ -595,8 +732,14 @@ def _parse_event_line(raw_line: str) -> LogEntry | None:
     )
 
 
+@functools.lru_cache(maxsize=256)
 def _parse_iso8601(value: str) -> datetime | None:
-    """Parse ISO timestamp value with timezone support."""
+    """Parse ISO timestamp value with timezone support.
+
+    Cached because every frame re-parses the same metrics timestamps
+    (`uptime_start`, `thinking_since`); datetimes are immutable, so sharing
+    results is safe.
+    """
     try:
         parsed = datetime.fromisoformat(value)
     except ValueError:
@@ -606,57 +749,104 @@ def _parse_iso8601(value: str) -> datetime | None:
     return parsed
 
 
-def _default_metrics_snapshot() -> dict[str, Any]:
-    """Return schema-compatible default metrics values."""
-    return {
-        "target": "claude",
-        "mode": "normal",
-        "collab_turn": None,
-        "collab_max": None,
-        "uptime_start": None,
-        "agents": {
-            "claude": {
-                "status": "idle",
-                "thinking_since": None,
-                "last_words": None,
-                "last_latency_s": None,
-            },
-            "codex": {
-                "status": "idle",
-                "thinking_since": None,
-                "last_words": None,
-                "last_latency_s": None,
-            },
+@functools.lru_cache(maxsize=4096)
+def _clock_text(epoch_seconds: int) -> str:
+    """Format a whole epoch second as local `HH:MM:SS` for log prefixes.
+
+    Cached because every frame re-renders the whole log buffer; keying on the
+    whole second lets entries logged within the same second share one
+    timezone conversion and `strftime`.
+    """
+    return datetime.fromtimestamp(epoch_seconds).strftime("%H:%M:%S")
+
+
+@functools.lru_cache(maxsize=4096)
+def _log_prefixes(epoch_seconds: int, kind: str) -> tuple[str, str]:
+    """Return the first-line prefix and equal-width continuation indent.
+
+    Entries logged in the same second with the same kind share one cached
+    pair, so redraws skip the padding and f-string assembly.
+    """
+    kind_padding = " " * max(0, 6 - len(kind))
+    prefix = f"{_clock_text(epoch_seconds)} {kind_padding}[{kind}] "
+    return prefix, " " * len(prefix)
+
+
+# built once at import; _default_metrics_snapshot hands out copies
+_DEFAULT_METRICS_SNAPSHOT: dict[str, Any] = {
+    "target": "claude",
+    "mode": "normal",
+    "collab_turn": None,
+    "collab_max": None,
+    "uptime_start": None,
+    "agents": {
+        "claude": {
+            "status": "idle",
+            "thinking_since": None,
+            "last_words": None,
+            "last_latency_s": None,
         },
+        "codex": {
+            "status": "idle",
+            "thinking_since": None,
+            "last_words": None,
+            "last_latency_s": None,
+        },
+    },
+}
+
+
+_METRICS_FIELDS = frozenset(_DEFAULT_METRICS_SNAPSHOT) - {"agents"}
+_AGENT_METRICS_FIELDS = frozenset(_DEFAULT_METRICS_SNAPSHOT["agents"]["claude"])
+
+
+def _default_metrics_snapshot() -> dict[str, Any]:
+    """Return schema-compatible default metrics values.
+
+    The template holds only scalars under two dict levels, so copying those
+    levels yields a fully independent snapshot without `deepcopy`.
+    """
+    snapshot = _DEFAULT_METRICS_SNAPSHOT.copy()
+    snapshot["agents"] = {
+        agent: fields.copy()
+        for agent, fields in _DEFAULT_METRICS_SNAPSHOT["agents"].items()
     }
+    return snapshot
 
 
 def _load_metrics_snapshot(path: Path, current: dict[str, Any]) -> dict[str, Any]:
     """Load metrics snapshot, falling back to current data when invalid."""
-    if not path.exists():
-        return current
     try:
-        payload = json.loads(path.read_text(encoding="utf-8", errors="replace"))
-    except (OSError, json.JSONDecodeError):
+        # parse the raw bytes; a missing file surfaces as OSError, so no
+        # separate exists() check is needed
+        payload = json.loads(path.read_bytes())
+    except (OSError, ValueError):
         return current
     if not isinstance(payload, dict):
         return current
 
-    merged = json.loads(json.dumps(_default_metrics_snapshot()))
+    merged = _default_metrics_snapshot()
     _merge_known_fields(merged, payload)
     return merged
 
 
 def _merge_known_fields(destination: dict[str, Any], source: dict[str, Any]) -> None:
-    """Merge only known keys from source into destination."""
-    for key, value in source.items():
-        if key not in destination:
-            continue
-        current = destination[key]
-        if isinstance(current, dict) and isinstance(value, dict):
-            _merge_known_fields(current, value)
-            continue
-        destination[key] = value
+    """Merge only known keys from source into a default metrics snapshot.
+
+    Known keys come from the snapshot template, so each level is one set
+    intersection with the source keys. Non-object `agents` entries are
+    ignored rather than replacing the default per-agent dicts.
+    """
+    for key in _METRICS_FIELDS.intersection(source):
+        destination[key] = source[key]
+    agents = source.get("agents")
+    if not isinstance(agents, dict):
+        return
+    for agent, fields in destination["agents"].items():
+        update = agents.get(agent)
+        if isinstance(update, dict):
+            for key in _AGENT_METRICS_FIELDS.intersection(update):
+                fields[key] = update[key]
 
 
 def _mode_text(metrics: dict[str, Any]) -> str:
@@ -675,8 +865,7 @@ def _uptime_text(metrics: dict[str, Any], *, now: datetime) -> str:
     parsed = _parse_iso8601(uptime_start)
     if parsed is None:
         return _format_elapsed(0.0)
-    elapsed = (now - parsed.astimezone(now.tzinfo or timezone.utc)).total_seconds()
-    return _format_elapsed(elapsed)
+    return _format_elapsed(now.timestamp() - parsed.timestamp())
 
 
 def _status_text(metrics: dict[str, Any], *, spinner_frame: str) -> tuple[str, str | None]:
@@ -689,30 +878,35 @@ def _status_text(metrics: dict[str, Any], *, spinner_frame: str) -> tuple[str, s
     return f"{spinner_frame} {active_agent}", active_agent
 
 
-def _active_thinking_agent(metrics: dict[str, Any]) -> str | None:
-    """Return the active thinking agent name, both, or none."""
+def _thinking_agents(metrics: dict[str, Any]) -> list[tuple[str, dict[str, Any]]]:
+    """Return `(agent, metrics dict)` pairs for agents currently thinking.
+
+    Resolves the nested `agents` lookups once so callers iterate the bound
+    per-agent dicts directly.
+    """
     agents = metrics.get("agents")
     if not isinstance(agents, dict):
-        return None
-
-    thinking_agents: list[str] = []
+        return []
+    thinking: list[tuple[str, dict[str, Any]]] = []
     for agent in ("claude", "codex"):
         data = agents.get(agent)
         if isinstance(data, dict) and data.get("status") == "thinking":
-            thinking_agents.append(agent)
+            thinking.append((agent, data))
+    return thinking
+
 
+def _active_thinking_agent(metrics: dict[str, Any]) -> str | None:
+    """Return the active thinking agent name, both, or none."""
+    thinking_agents = _thinking_agents(metrics)
     if not thinking_agents:
         return None
     if len(thinking_agents) == 1:
-        return thinking_agents[0]
+        return thinking_agents[0][0]
 
     # prefer the most recently started thinking agent if timestamps are valid
     latest_agent: str | None = None
     latest_time: datetime | None = None
-    for agent in thinking_agents:
-        data = agents.get(agent)
-        if not isinstance(data, dict):
-            continue
+    for agent, data in thinking_agents:
         raw_since = data.get("thinking_since")
         if not isinstance(raw_since, str):
             continue
@@ -726,6 +920,13 @@ def _active_thinking_agent(metrics: dict[str, Any]) -> str | None:
     return latest_agent or "both"
 
 
+def _entry_agent(entry: LogEntry) -> str | None:
+    """Return the agent a log row refers to: a sent row's target, else its agent."""
+    if entry.kind == "sent":
+        return entry.target
+    return entry.agent
+
+
 def _derive_turn_counts(entries: Iterable[LogEntry]) -> dict[str, int]:
     """Count completed turns per agent from recv events."""
     counts = {"claude": 0, "codex": 0}
@@ -737,18 +938,46 @@ def _derive_turn_counts(entries: Iterable[LogEntry]) -> dict[str, int]:
 
 def _derive_completed_thinking_seconds(entries: Iterable[LogEntry]) -> float:
     """Sum thinking durations by pairing sent(target) to recv(agent)."""
-    sent_starts: dict[str, datetime] = {}
+    rows = list(entries)
+    return _sum_completed_thinking(
+        [entry.kind for entry in rows],
+        [_entry_agent(entry) for entry in rows],
+        [entry.timestamp.timestamp() for entry in rows],
+    )
+
+
+def _sum_completed_thinking(
+    kinds: Iterable[str],
+    agents: Iterable[str | None],
+    seconds: Iterable[float],
+) -> float:
+    """Sum sent-to-recv durations over parallel row columns.
+
+    Timestamps are epoch floats, so each duration is a plain float
+    subtraction rather than a `timedelta`.
+
+    Args:
+        kinds: Row kinds.
+        agents: Agent each row refers to (see `_entry_agent`).
+        seconds: Row timestamps as epoch seconds.
+
+    Returns:
+        Total positive thinking seconds across completed pairs.
+    """
+    sent_starts: dict[str, float] = {}
     total = 0.0
-    for entry in entries:
-        if entry.kind == "sent" and entry.target in {"claude", "codex"}:
-            sent_starts[entry.target] = entry.timestamp
+    for kind, agent, at in zip(kinds, agents, seconds):
+        if agent != "claude" and agent != "codex":
             continue
-        if entry.kind != "recv" or entry.agent not in {"claude", "codex"}:
+        if kind == "sent":
+            sent_starts[agent] = at
             continue
-        start = sent_starts.pop(entry.agent, None)
+        if kind != "recv":
+            continue
+        start = sent_starts.pop(agent, None)
         if start is None:
             continue
-        duration = (entry.timestamp - start).total_seconds()
+        duration = at - start
         if duration > 0:
             total += duration
     return total
@@ -756,22 +985,18 @@ def _derive_completed_thinking_seconds(entries: Iterable[LogEntry]) -> float:
 
 def _derive_inflight_thinking_seconds(metrics: dict[str, Any], *, now: datetime) -> float:
     """Return current in-flight thinking time from metrics thinking_since."""
-    agents = metrics.get("agents")
-    if not isinstance(agents, dict):
-        return 0.0
-
+    now_seconds = now.timestamp()
     total = 0.0
-    for agent in ("claude", "codex"):
-        data = agents.get(agent)
-        if not isinstance(data, dict) or data.get("status") != "thinking":
-            continue
+    for _agent, data in _thinking_agents(metrics):
         raw_since = data.get("thinking_since")
         if not isinstance(raw_since, str):
             continue
         parsed_since = _parse_iso8601(raw_since)
         if parsed_since is None:
             continue
-        elapsed = (now - parsed_since.astimezone(now.tzinfo or timezone.utc)).total_seconds()
+        # parsed values are always timezone-aware, so epoch seconds compare
+        # directly without converting zones
+        elapsed = now_seconds - parsed_since.timestamp()
         if elapsed > 0:
             total += elapsed
     return total
@@ -788,7 +1013,17 @@ def _segment_groups_width(groups: Iterable[Iterable[tuple[str, int]]]) -> int:
 
 def _format_elapsed(seconds: float) -> str:
     """Format elapsed seconds as compact uptime text."""
-    bounded = max(0, int(seconds))
+    return _format_whole_seconds(max(0, int(seconds)))
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_whole_seconds(bounded: int) -> str:
+    """Format non-negative whole seconds as compact uptime text.
+
+    Cached separately from `_format_elapsed` so float inputs from the same
+    second share one entry; the strip re-formats uptime and think time on
+    every frame.
+    """
     hours, remainder = divmod(bounded, 3600)
     minutes, secs = divmod(remainder, 60)
     if hours > 0:
@@ -800,13 +1035,18 @@ def _format_elapsed(seconds: float) -> str:
 
 def _looks_interactive_command(command: str) -> bool:
     """Return true for known interactive shell commands."""
-    try:
-        tokens = shlex.split(command)
-    except ValueError:
-        return False
+    if _SHELL_QUOTING_CHARS.isdisjoint(command):
+        # no quoting to resolve: the first whitespace-separated word is the
+        # binary, so skip tokenizing the whole command line
+        tokens = command.split(None, 1)
+    else:
+        try:
+            tokens = shlex.split(command)
+        except ValueError:
+            return False
     if not tokens:
         return False
-    binary = Path(tokens[0]).name
+    binary = os.path.basename(tokens[0])
     return binary in INTERACTIVE_COMMANDS
 
 
@@ -818,17 +1058,21 @@ def _collect_capped_output(
     max_bytes: int,
 ) -> tuple[list[str], bool]:
     """Collect stdout/stderr lines with line and byte caps."""
-    combined: list[str] = []
-    if stdout:
-        combined.extend(stdout.splitlines())
-    if stderr:
-        combined.extend(f"[stderr] {line}" for line in stderr.splitlines())
-
     lines: list[str] = []
     total_bytes = 0
     truncated = False
-    for line in combined:
-        line_bytes = len(line.encode("utf-8")) + 1
+    # each line is charged at least half of its characters plus terminator
+    # (a `\r\n` line of n characters costs n + 1 bytes), so every run of
+    # lines that fits `max_bytes` lies within the first 2 * (max_bytes + 1)
+    # characters of a stream
+    for line in _output_lines(stdout, stderr, 2 * (max_bytes + 1)):
+        if line is None:
+            truncated = True
+            break
+        if line.isascii():
+            line_bytes = len(line) + 1
+        else:
+            line_bytes = len(line.encode("utf-8")) + 1
         if len(lines) >= max_lines or total_bytes + line_bytes > max_bytes:
             truncated = True
             break
@@ -837,13 +1081,40 @@ def _collect_capped_output(
     return lines, truncated
 
 
+def _output_lines(stdout: str, stderr: str, limit: int) -> Iterator[str | None]:
+    """Yield stdout lines, then `[stderr]`-tagged stderr lines, lazily.
+
+    Only the first `limit` characters of each stream are split, so huge
+    outputs are never split in full. When a stream is longer than `limit`,
+    None follows its lines to mark the cut; the last line before it may be
+    a fragment. stderr is only split once the caller consumes past stdout.
+    """
+    if stdout:
+        yield from stdout[:limit].splitlines()
+        if len(stdout) > limit:
+            yield None
+    if stderr:
+        for line in stderr[:limit].splitlines():
+            yield f"[stderr] {line}"
+        if len(stderr) > limit:
+            yield None
+
+
+# exact-type converters for _as_text; one dict lookup replaces the
+# isinstance chain
+_TEXT_CONVERTERS: dict[type, Callable[[Any], str]] = {
+    type(None): lambda _value: "",
+    str: lambda value: value,
+    bytes: lambda value: value.decode("utf-8", errors="replace"),
+}
+
+
 def _as_text(value: str | bytes | None) -> str:
     """Convert subprocess output values to text."""
-    if value is None:
-        return ""
-    if isinstance(value, str):
-        return value
-    return value.decode("utf-8", errors="replace")
+    converter = _TEXT_CONVERTERS.get(type(value))
+    if converter is None:
+        return str(value)
+    return converter(value)
 
 
 def run_sidebar(workspace_root: Path) -> int:
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import functools
+import os
 import shutil
 import subprocess
 import sys
@@ -13,7 +15,7 @@ from .constants import LAYOUT_BOTTOM_PERCENT, LAYOUT_SIDEBAR_PERCENT, SESSION_NA
 from .errors import ClaodexError
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PaneLayout:
     """Resolved pane ids for a claodex tmux session."""
 
@@ -46,6 +48,29 @@ def _run_tmux(args: list[str], *, capture_output: bool = True, check: bool = Tru
     return result
 
 
+def _run_tmux_chain(commands: list[list[str]], **kwargs) -> subprocess.CompletedProcess:
+    """Run several tmux commands through one tmux client process.
+
+    Commands are joined with tmux's `;` separator, so tmux runs them in
+    order and stops at the first failure. tmux also treats any argument
+    ending in an unescaped `;` as a separator, so such arguments are sent
+    with the trailing `;` escaped as `\\;`, which tmux unescapes.
+
+    Args:
+        commands: tmux subcommand argvs, in execution order.
+        **kwargs: Forwarded to `_run_tmux`.
+
+    Returns:
+        Completed subprocess result.
+    """
+    args: list[str] = []
+    for command in commands:
+        if args:
+            args.append(";")
+        args.extend(f"{arg[:-1]}\\;" if arg.endswith(";") else arg for arg in command)
+    return _run_tmux(args, **kwargs)
+
+
 def ensure_dependencies() -> None:
     """Fail fast when required executables are missing."""
     missing = [binary for binary in ("tmux", "claude", "codex") if shutil.which(binary) is None]
@@ -188,51 +213,29 @@ def resolve_layout(session_name: str = SESSION_NAME) -> PaneLayout:
         ]
     )
 
-    panes: list[dict] = []
+    # (top, left, pane_id) tuples sort straight into reading order
+    panes: list[tuple[int, int, str]] = []
     for row in result.stdout.splitlines():
-        pane_id, top, left, width, height = row.split("\t")
-        panes.append(
-            {
-                "pane_id": pane_id,
-                "top": int(top),
-                "left": int(left),
-                "width": int(width),
-                "height": int(height),
-            }
-        )
+        pane_id, top, left, _width, _height = row.split("\t")
+        panes.append((int(top), int(left), pane_id))
 
     if len(panes) != 4:
         raise ClaodexError(f"expected 4 panes in session '{session_name}', found {len(panes)}")
 
-    rows: dict[int, list[dict]] = {}
-    for pane in panes:
-        rows.setdefault(pane["top"], []).append(pane)
-
-    if len(rows) != 2:
+    panes.sort()
+    row_tops = {top for top, _left, _pane_id in panes}
+    if len(row_tops) != 2:
         raise ClaodexError("could not resolve pane rows")
-
-    ordered_rows = sorted(rows.items(), key=lambda item: item[0])
-    top_row = ordered_rows[0][1]
-    bottom_row = ordered_rows[1][1]
-
-    if len(top_row) != 2:
+    # with four panes in two rows, two panes in the top row leaves exactly
+    # two for the bottom row
+    if panes[1][0] != panes[0][0] or panes[2][0] == panes[0][0]:
         raise ClaodexError("could not resolve top-row panes")
-    if len(bottom_row) != 2:
-        raise ClaodexError("could not resolve bottom-row panes")
-
-    top_row_sorted = sorted(top_row, key=lambda item: item["left"])
-    bottom_row_sorted = sorted(bottom_row, key=lambda item: item["left"])
-
-    codex_pane = top_row_sorted[0]["pane_id"]
-    claude_pane = top_row_sorted[1]["pane_id"]
-    input_pane = bottom_row_sorted[0]["pane_id"]
-    sidebar_pane = bottom_row_sorted[1]["pane_id"]
 
     return PaneLayout(
-        codex=codex_pane,
-        claude=claude_pane,
-        input=input_pane,
-        sidebar=sidebar_pane,
+        codex=panes[0][2],
+        claude=panes[1][2],
+        input=panes[2][2],
+        sidebar=panes[3][2],
     )
 
 
@@ -251,8 +254,12 @@ def start_agent_processes(layout: PaneLayout, workspace_root: Path) -> None:
     env_prefix = "env -u CLAUDECODE -u CODEX_THREAD_ID -u CODEX_SANDBOX_ENV"
     codex_command = f"cd {ws} && {env_prefix} codex"
     claude_command = f"cd {ws} && {env_prefix} claude"
-    _run_tmux(["send-keys", "-t", layout.codex, codex_command, "C-m"])
-    _run_tmux(["send-keys", "-t", layout.claude, claude_command, "C-m"])
+    _run_tmux_chain(
+        [
+            ["send-keys", "-t", layout.codex, codex_command, "C-m"],
+            ["send-keys", "-t", layout.claude, claude_command, "C-m"],
+        ]
+    )
 
 
 def start_sidebar_process(layout: PaneLayout, workspace_root: Path) -> None:
@@ -309,9 +316,12 @@ def prefill_skill_commands(layout: PaneLayout) -> list[str]:
         ("claude", layout.claude, "/claodex"),
     ]
 
-    # `-l` for literal text, `--` to prevent tmux flag interpretation
+    # `-l` for literal text, `--` to prevent tmux flag interpretation;
+    # both panes are typed into by one tmux call, then verified in turn
+    _run_tmux_chain(
+        [["send-keys", "-t", pane_id, "-l", "--", command] for _agent, pane_id, command in prefill_targets]
+    )
     for agent, pane_id, command in prefill_targets:
-        _run_tmux(["send-keys", "-t", pane_id, "-l", "--", command])
         if not verify_prefill(pane_id, command):
             warnings.append(
                 f"prefill not confirmed for {agent}; "
@@ -377,20 +387,9 @@ def _submit_delay(content: str) -> float:
     Returns:
         Delay in seconds.
     """
-    import os
-
     override = os.environ.get("CLAODEX_PASTE_SUBMIT_DELAY_SECONDS")
     if override is not None:
-        try:
-            value = float(override)
-        except (ValueError, OverflowError):
-            value = float("nan")
-        if not (0 <= value <= 10):
-            raise ClaodexError(
-                f"invalid CLAODEX_PASTE_SUBMIT_DELAY_SECONDS: {override!r} "
-                f"(must be a number between 0 and 10)"
-            )
-        return value
+        return _parse_submit_delay_override(override)
 
     # base 0.3s covers payloads up to ~2000 chars comfortably;
     # add 0.1s per additional 1000 chars, capped at 2s
@@ -399,6 +398,35 @@ def _submit_delay(content: str) -> float:
     return min(base + extra, 2.0)
 
 
+@functools.lru_cache(maxsize=4)
+def _parse_submit_delay_override(override: str) -> float:
+    """Validate a CLAODEX_PASTE_SUBMIT_DELAY_SECONDS value.
+
+    Cached on the raw string, since the variable rarely changes within a
+    process; invalid values raise on every call because exceptions are not
+    cached.
+
+    Args:
+        override: Raw environment variable value.
+
+    Returns:
+        Delay in seconds.
+
+    Raises:
+        ClaodexError: If the value is not a number between 0 and 10.
+    """
+    try:
+        value = float(override)
+    except (ValueError, OverflowError):
+        value = float("nan")
+    if not (0 <= value <= 10):
+        raise ClaodexError(
+            f"invalid CLAODEX_PASTE_SUBMIT_DELAY_SECONDS: {override!r} "
+            f"(must be a number between 0 and 10)"
+        )
+    return value
+
+
 def paste_content(pane_id: str, content: str) -> None:
     """Paste content into a pane and submit.
 
@@ -417,9 +445,11 @@ def paste_content(pane_id: str, content: str) -> None:
         content: Message to inject.
     """
     # load-buffer from stdin avoids the ~16 KB CLI argument limit that
-    # set-buffer hits on large peer deltas
+    # set-buffer hits on large peer deltas; paste-buffer is chained into
+    # the same tmux call and only runs once the buffer has loaded.
+    # -p skips bracketed-paste escapes that TUIs intercept and mangle
     result = subprocess.run(
-        ["tmux", "load-buffer", "-"],
+        ["tmux", "load-buffer", "-", ";", "paste-buffer", "-p", "-t", pane_id],
         input=content,
         text=True,
         capture_output=True,
@@ -428,8 +458,7 @@ def paste_content(pane_id: str, content: str) -> None:
     if result.returncode != 0:
         stderr = result.stderr.strip()
         raise ClaodexError(stderr or "tmux load-buffer failed")
-    # -p skips bracketed-paste escapes that TUIs intercept and mangle
-    _run_tmux(["paste-buffer", "-p", "-t", pane_id])
+    # the submit waits out the paste settle delay, so it cannot be chained
     time.sleep(_submit_delay(content))
     _run_tmux(["send-keys", "-t", pane_id, "C-m"])
 
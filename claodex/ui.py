@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import os
 import threading
@@ -27,6 +28,14 @@ PERSISTED_EVENT_KINDS = frozenset(
 METRIC_MODES = frozenset({"normal", "collab"})
 AGENT_STATUSES = frozenset({"idle", "thinking"})
 
+# compact separators: events.jsonl is machine-read, so the default ", " and
+# ": " padding only adds bytes per row
+_encode_event = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_encode_metrics = json.JSONEncoder(ensure_ascii=False, indent=2).encode
+# bound once so each event timestamp skips the lambda frame and attribute
+# lookups
+_utc_now = functools.partial(datetime.now, timezone.utc)
+
 
 class UIEventBus:
     """Thread-safe writer for UI events and metrics snapshots."""
@@ -51,19 +60,24 @@ class UIEventBus:
         self._workspace_root = workspace_root
         self._events_path = workspace_root / UI_EVENTS_FILE
         self._metrics_path = workspace_root / UI_METRICS_FILE
-        self._now = now_provider or (lambda: datetime.now(timezone.utc))
+        self._now = now_provider or _utc_now
         self._lock = threading.Lock()
         self._closed = False
 
         self._events_path.parent.mkdir(parents=True, exist_ok=True)
-        self._events_handle = self._events_path.open("a", encoding="utf-8")
+        # binary append handle: each event is pre-encoded outside the lock and
+        # lands with one write + flush
+        self._events_handle = self._events_path.open("ab")
 
         self._metrics_snapshot = _default_metrics_snapshot(
             target=default_target,
             uptime_start=_iso_timestamp(self._now()),
         )
         _validate_metrics_snapshot(self._metrics_snapshot)
-        self._write_metrics_locked()
+        # bumped per published snapshot; writes of older versions are dropped
+        self._metrics_version = 0
+        self._metrics_written_version = 0
+        self._write_metrics_locked(_encode_metrics(self._metrics_snapshot) + "\n")
 
     def log(
         self,
@@ -103,9 +117,11 @@ class UIEventBus:
             "meta": meta,
         }
 
+        payload = (_encode_event(event) + "\n").encode("utf-8")
+
         with self._lock:
             self._ensure_open_locked()
-            self._events_handle.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self._events_handle.write(payload)
             self._events_handle.flush()
 
     def update_metrics(self, **fields: Any) -> None:
@@ -123,7 +139,18 @@ class UIEventBus:
             _merge_with_schema(updated_snapshot, fields, path="metrics")
             _validate_metrics_snapshot(updated_snapshot)
             self._metrics_snapshot = updated_snapshot
-            self._write_metrics_locked()
+            self._metrics_version += 1
+            version = self._metrics_version
+
+        # published snapshots are never mutated, so serialization can run
+        # outside the lock
+        payload = _encode_metrics(updated_snapshot) + "\n"
+
+        with self._lock:
+            # a concurrent update may have written a newer snapshot already
+            if version > self._metrics_written_version:
+                self._write_metrics_locked(payload)
+                self._metrics_written_version = version
 
     def close(self) -> None:
         """Flush and close open handles."""
@@ -134,13 +161,15 @@ class UIEventBus:
             self._events_handle.close()
             self._closed = True
 
-    def _write_metrics_locked(self) -> None:
-        """Write canonical metrics snapshot atomically.
+    def _write_metrics_locked(self, payload: str) -> None:
+        """Write an encoded metrics snapshot atomically.
 
         Assumes caller holds `_lock`.
+
+        Args:
+            payload: Serialized metrics snapshot.
         """
         tmp_path = self._metrics_path.with_name(f"{self._metrics_path.name}.tmp")
-        payload = json.dumps(self._metrics_snapshot, ensure_ascii=False, indent=2) + "\n"
         tmp_path.write_text(payload, encoding="utf-8")
         os.replace(tmp_path, self._metrics_path)
 
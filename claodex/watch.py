@@ -0,0 +1,170 @@
+"""File change notification helpers for claodex."""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import io
+import os
+import selectors
+import struct
+import sys
+import time
+from collections.abc import Collection
+from pathlib import Path
+
+# event masks from <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+
+# struct inotify_event header: wd, mask, cookie, name length
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+class FileWatcher:
+    """Wait for changes to a set of files, falling back to plain sleeps.
+
+    On Linux the parent directory of every watched file is registered with
+    one inotify instance, and waits block on it through a single selector
+    (epoll), so `wait` returns as soon as a watched file is written, created,
+    or moved into place. Watching directories rather than files keeps the
+    watch valid when a file does not exist yet or is replaced. Elsewhere, or
+    when inotify is unavailable, `wait` sleeps for the full timeout.
+    """
+
+    def __init__(self) -> None:
+        """Initialize watcher, enabling inotify when the platform supports it."""
+        self._libc: ctypes.CDLL | None = None
+        # FileIO owns the descriptor so it is closed when the watcher is
+        # garbage collected, even if close() is never called
+        self._stream: io.FileIO | None = None
+        self._selector: selectors.BaseSelector | None = None
+        self._dirs: dict[Path, int] = {}
+        self._dir_paths: dict[int, Path] = {}
+        self._names: dict[int, set[str]] = {}
+        if sys.platform.startswith("linux"):
+            self._open_inotify()
+
+    @property
+    def active(self) -> bool:
+        """Return True when waits can return early on file changes."""
+        return self._stream is not None
+
+    def _open_inotify(self) -> None:
+        """Create a non-blocking inotify instance through libc."""
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd < 0:
+            return
+        self._libc = libc
+        self._stream = io.FileIO(fd, "rb", closefd=True)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._stream, selectors.EVENT_READ)
+
+    def watch(self, path: Path) -> None:
+        """Start reporting changes to one file.
+
+        Missing or unwatchable parent directories are ignored; `wait` still
+        times out normally, so callers keep their polling behavior.
+
+        Args:
+            path: File to watch.
+        """
+        if self._stream is None or self._libc is None:
+            return
+        directory = path.parent
+        descriptor = self._dirs.get(directory)
+        if descriptor is None:
+            descriptor = self._libc.inotify_add_watch(
+                self._stream.fileno(), os.fsencode(directory), _WATCH_MASK
+            )
+            if descriptor < 0:
+                return
+            self._dirs[directory] = descriptor
+            self._dir_paths[descriptor] = directory
+        self._names.setdefault(descriptor, set()).add(path.name)
+
+    def wait(self, timeout: float, paths: Collection[Path] | None = None) -> bool:
+        """Block until a watched file changes or the timeout elapses.
+
+        Args:
+            timeout: Maximum seconds to wait.
+            paths: Watched files that should end the wait; changes to other
+                watched files are consumed without waking. None means any
+                watched file.
+
+        Returns:
+            True when a matching file changed before the timeout.
+        """
+        if timeout <= 0:
+            return False
+        if self._selector is None or not self._dirs:
+            time.sleep(timeout)
+            return False
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if not self._selector.select(remaining):
+                return False
+            changed = self._drain_events()
+            if changed is None:
+                # events were dropped; assume a matching file changed
+                return True
+            if paths is None and changed:
+                return True
+            if paths is not None and not changed.isdisjoint(paths):
+                return True
+
+    def _drain_events(self) -> set[Path] | None:
+        """Consume pending inotify events.
+
+        Returns:
+            Watched files named by the consumed events, or None when the
+            kernel queue overflowed and events were lost.
+        """
+        assert self._stream is not None
+        changed: set[Path] | None = set()
+        while True:
+            data = self._stream.read(_READ_SIZE)
+            # a non-blocking FileIO returns None (not BlockingIOError) once
+            # the queue is empty
+            if not data:
+                break
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                descriptor, mask, _cookie, name_length = _EVENT_HEADER.unpack_from(
+                    data, offset
+                )
+                name_start = offset + _EVENT_HEADER.size
+                raw_name = data[name_start : name_start + name_length]
+                offset = name_start + name_length
+                if mask & _IN_Q_OVERFLOW:
+                    changed = None
+                    continue
+                name = os.fsdecode(raw_name.rstrip(b"\0"))
+                if changed is not None and name in self._names.get(descriptor, ()):
+                    changed.add(self._dir_paths[descriptor] / name)
+        return changed
+
+    def close(self) -> None:
+        """Release the inotify descriptor."""
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        self._dirs.clear()
+        self._dir_paths.clear()
+        self._names.clear()
@@ -466,6 +466,7 @@ def test_run_repl_status_command_emits_status_event(tmp_path):
     fake_router = type("FakeRouter", (), {
         "participants": participants,
         "workspace_root": workspace,
+        "close": lambda self: None,
     })()
 
     with (
@@ -486,6 +487,51 @@ def test_run_repl_status_command_emits_status_event(tmp_path):
     assert seen_buses[0].closed is True
 
 
+def test_run_repl_closes_router_and_bus_on_exit(tmp_path):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    session_file = tmp_path / "session.jsonl"
+    session_file.write_text("", encoding="utf-8")
+    participants = _build_participants(workspace, session_file)
+    application = ClaodexApplication()
+    router = _ReplRouterStub()
+    bus = _BusRecorder()
+
+    def fake_read_event(_target: str, on_idle=None):  # noqa: ANN001
+        _ = on_idle
+        return InputEvent(kind="quit")
+
+    with (
+        patch("claodex.cli.UIEventBus", return_value=bus),
+        patch("claodex.cli.Router", return_value=router),
+        patch("claodex.cli.kill_session"),
+        patch.object(application, "_read_event", side_effect=fake_read_event),
+    ):
+        application._run_repl(workspace, participants)
+
+    assert router.closed is True
+    assert bus.closed is True
+
+
+def test_run_repl_closes_bus_when_router_construction_fails(tmp_path):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    session_file = tmp_path / "session.jsonl"
+    session_file.write_text("", encoding="utf-8")
+    participants = _build_participants(workspace, session_file)
+    application = ClaodexApplication()
+    bus = _BusRecorder()
+
+    with (
+        patch("claodex.cli.UIEventBus", return_value=bus),
+        patch("claodex.cli.Router", side_effect=ClaodexError("router failed")),
+        pytest.raises(ClaodexError, match="router failed"),
+    ):
+        application._run_repl(workspace, participants)
+
+    assert bus.closed is True
+
+
 def test_run_repl_toggle_updates_metrics_target(tmp_path):
     workspace = tmp_path / "workspace"
     workspace.mkdir()
@@ -515,7 +561,7 @@ def test_run_repl_toggle_updates_metrics_target(tmp_path):
 
     with (
         patch("claodex.cli.UIEventBus", side_effect=fake_bus),
-        patch("claodex.cli.Router", return_value=object()),
+        patch("claodex.cli.Router", return_value=_ReplRouterStub()),
         patch("claodex.cli.kill_session"),
         patch.object(application, "_read_event", side_effect=fake_read_event),
     ):
@@ -558,7 +604,7 @@ def test_run_repl_toggle_preserves_draft_as_prefill(tmp_path):
 
     with (
         patch("claodex.cli.UIEventBus", side_effect=fake_bus),
-        patch("claodex.cli.Router", return_value=object()),
+        patch("claodex.cli.Router", return_value=_ReplRouterStub()),
         patch("claodex.cli.kill_session"),
         patch.object(application, "_read_event", side_effect=fake_read_event),
     ):
@@ -590,7 +636,7 @@ def test_run_repl_collab_command_clears_terminal_line(tmp_path):
 
     with (
         patch("claodex.cli.UIEventBus", return_value=_BusRecorder()),
-        patch("claodex.cli.Router", return_value=object()),
+        patch("claodex.cli.Router", return_value=_ReplRouterStub()),
         patch("claodex.cli.kill_session"),
         patch.object(application, "_read_event", side_effect=fake_read_event),
         patch.object(application, "_run_collab") as run_collab_mock,
@@ -638,7 +684,7 @@ def test_run_repl_seeded_collab_clears_terminal_line(tmp_path):
 
     with (
         patch("claodex.cli.UIEventBus", return_value=_BusRecorder()),
-        patch("claodex.cli.Router", return_value=object()),
+        patch("claodex.cli.Router", return_value=_ReplRouterStub()),
         patch("claodex.cli.kill_session"),
         patch.object(application, "_read_event", side_effect=fake_read_event),
         patch.object(application._editor, "confirm", return_value=True),
@@ -670,7 +716,7 @@ def test_run_repl_seeded_collab_accepted(tmp_path):
     bus = _BusRecorder()
     with (
         patch("claodex.cli.UIEventBus", return_value=bus),
-        patch("claodex.cli.Router", return_value=object()),
+        patch("claodex.cli.Router", return_value=_ReplRouterStub()),
         patch("claodex.cli.kill_session"),
         patch.object(application, "_read_event", side_effect=fake_read_event),
         patch.object(application._editor, "confirm", return_value=True),
@@ -703,7 +749,7 @@ def test_run_repl_seeded_collab_declined(tmp_path):
     bus = _BusRecorder()
     with (
         patch("claodex.cli.UIEventBus", return_value=bus),
-        patch("claodex.cli.Router", return_value=object()),
+        patch("claodex.cli.Router", return_value=_ReplRouterStub()),
         patch("claodex.cli.kill_session"),
         patch.object(application, "_read_event", side_effect=fake_read_event),
         patch.object(application._editor, "confirm", return_value=False),
@@ -845,6 +891,10 @@ class _ReplRouterStub:
         self.clear_latch_calls: list[tuple[str, int]] = []
         self._next_before_cursor = 0
         self.config = type("Config", (), {"turn_timeout_seconds": 18000})()
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
 
     def send_user_message(self, target_agent: str, user_text: str) -> PendingSend:
         self.sent_user_messages.append((target_agent, user_text))
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 import json
+import os
 from pathlib import Path
+import shutil
 
 import pytest
 
@@ -21,14 +23,18 @@ from claodex.state import (
 )
 
 
+# one shared encoder skips json.dumps argument handling per fixture row
+_encode_row = json.JSONEncoder().encode
+
+
 def _write_jsonl(path: Path, entries: list[dict | str]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as handle:
-        for entry in entries:
-            if isinstance(entry, str):
-                handle.write(entry + "\n")
-                continue
-            handle.write(json.dumps(entry) + "\n")
+    # serialize every row into one string, then encode and write it once
+    blob = "".join(
+        f"{entry if isinstance(entry, str) else _encode_row(entry)}\n"
+        for entry in entries
+    )
+    path.write_bytes(blob.encode("utf-8"))
 
 
 def _claude_entries(user_text: str, assistant_text: str) -> list[dict]:
@@ -170,18 +176,26 @@ def _codex_turn_entries(
     assistant_text: str,
     include_task_started: bool,
     include_task_complete: bool,
+    include_session_meta: bool = True,
+    start_second: int = 0,
 ) -> list[dict]:
-    entries = [
-        {
-            "timestamp": "2026-02-22T10:00:00Z",
-            "type": "session_meta",
-            "payload": {"id": "codex-session", "cwd": "ignored"},
-        }
-    ]
+    # start_second offsets every timestamp so composed sessions stay ordered
+    def timestamp(offset: int) -> str:
+        return f"2026-02-22T10:00:{start_second + offset:02d}Z"
+
+    entries = []
+    if include_session_meta:
+        entries.append(
+            {
+                "timestamp": timestamp(0),
+                "type": "session_meta",
+                "payload": {"id": "codex-session", "cwd": "ignored"},
+            }
+        )
     if include_task_started:
         entries.append(
             {
-                "timestamp": "2026-02-22T10:00:00Z",
+                "timestamp": timestamp(0),
                 "type": "event_msg",
                 "payload": {"type": "task_started"},
             }
@@ -189,12 +203,12 @@ def _codex_turn_entries(
     entries.extend(
         [
             {
-                "timestamp": "2026-02-22T10:00:01Z",
+                "timestamp": timestamp(1),
                 "type": "event_msg",
                 "payload": {"type": "user_message", "message": user_text},
             },
             {
-                "timestamp": "2026-02-22T10:00:02Z",
+                "timestamp": timestamp(2),
                 "type": "response_item",
                 "payload": {
                     "type": "message",
@@ -207,7 +221,7 @@ def _codex_turn_entries(
     if include_task_complete:
         entries.append(
             {
-                "timestamp": "2026-02-22T10:00:03Z",
+                "timestamp": timestamp(3),
                 "type": "event_msg",
                 "payload": {"type": "task_complete"},
             }
@@ -215,6 +229,18 @@ def _codex_turn_entries(
     return entries
 
 
+def _codex_prev_turn_entries(user_text: str, assistant_text: str) -> list[dict]:
+    """Return a completed Codex turn that precedes the turn under test."""
+    return [
+        *_codex_entries(user_text, assistant_text),
+        {
+            "timestamp": "2026-02-22T10:00:03Z",
+            "type": "event_msg",
+            "payload": {"type": "task_complete"},
+        },
+    ]
+
+
 def _participants(
     workspace: Path, claude_session: Path, codex_session: Path
 ) -> SessionParticipants:
@@ -238,6 +264,61 @@ def _participants(
     )
 
 
+def _noop_paste(pane: str, content: str) -> None:
+    return None
+
+
+def _always_alive(pane: str) -> bool:
+    return True
+
+
+def _set_cursors(
+    workspace: Path,
+    *,
+    claude_read: int,
+    codex_read: int,
+    codex_delivery: int,
+    claude_delivery: int,
+) -> None:
+    write_read_cursor(workspace, "claude", claude_read)
+    write_read_cursor(workspace, "codex", codex_read)
+    write_delivery_cursor(workspace, "codex", codex_delivery)
+    write_delivery_cursor(workspace, "claude", claude_delivery)
+
+
+@pytest.fixture(scope="session")
+def canonical_claude_session(tmp_path_factory) -> Path:
+    path = tmp_path_factory.mktemp("canonical") / "claude.jsonl"
+    _write_jsonl(path, _claude_entries("task", "done"))
+    return path
+
+
+@pytest.fixture(scope="session")
+def canonical_codex_session(tmp_path_factory) -> Path:
+    path = tmp_path_factory.mktemp("canonical") / "codex.jsonl"
+    _write_jsonl(path, _codex_entries("ack", "ack"))
+    return path
+
+
+@pytest.fixture
+def workspace(tmp_path) -> Path:
+    workspace = tmp_path / "workspace"
+    ensure_state_layout(workspace)
+    return workspace
+
+
+@pytest.fixture
+def claude_session(tmp_path, canonical_claude_session) -> Path:
+    # private copy of the canonical file, so appends never leak across tests
+    return shutil.copyfile(canonical_claude_session, tmp_path / "claude.jsonl")
+
+
+@pytest.fixture
+def codex_session(tmp_path, canonical_codex_session) -> Path:
+    # private copy of the canonical file, so appends never leak across tests
+    return shutil.copyfile(canonical_codex_session, tmp_path / "codex.jsonl")
+
+
 def test_parse_collab_request_defaults():
     parsed = parse_collab_request("/collab design api", default_start="claude")
     assert parsed.turns == 12
@@ -371,21 +452,25 @@ counterpoint
     assert strip_injected_context(message) == ""
 
 
-def test_send_user_message_includes_peer_delta_and_advances_delivery_cursor(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
+def test_strip_injected_context_requires_leading_header():
+    message = """---
+--- user ---
+not a claodex block
+"""
+    assert strip_injected_context(message) == message
 
-    claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
-    _write_jsonl(claude_session, _claude_entries("task", "done"))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
+def test_send_user_message_includes_peer_delta_and_advances_delivery_cursor(
+    workspace, claude_session, codex_session
+):
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     sent_messages: list[str] = []
 
@@ -393,7 +478,7 @@ def test_send_user_message_includes_peer_delta_and_advances_delivery_cursor(tmp_
         workspace_root=workspace,
         participants=participants,
         paste_content=lambda pane, content: sent_messages.append(content),
-        pane_alive=lambda pane: True,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.05, turn_timeout_seconds=5),
     )
 
@@ -408,13 +493,10 @@ def test_send_user_message_includes_peer_delta_and_advances_delivery_cursor(tmp_
     )
 
 
-def test_send_user_message_filters_meta_user_rows_from_peer_delta(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
+def test_send_user_message_filters_meta_user_rows_from_peer_delta(
+    tmp_path, workspace, codex_session
+):
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(
         claude_session,
         [
@@ -444,20 +526,22 @@ def test_send_user_message_filters_meta_user_rows_from_peer_delta(tmp_path):
             },
         ],
     )
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     sent_messages: list[str] = []
     router = Router(
         workspace_root=workspace,
         participants=participants,
         paste_content=lambda pane, content: sent_messages.append(content),
-        pane_alive=lambda pane: True,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.05, turn_timeout_seconds=5),
     )
 
@@ -471,12 +555,10 @@ def test_send_user_message_filters_meta_user_rows_from_peer_delta(tmp_path):
     assert payload.endswith("--- user ---\nplease review")
 
 
-def test_send_user_message_to_peer_does_not_redeliver_stacked_user_rows(tmp_path):
+def test_send_user_message_to_peer_does_not_redeliver_stacked_user_rows(
+    tmp_path, workspace
+):
     """After initial delivery, repeated user rows are not re-sent as stale delta."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
     codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(
@@ -508,10 +590,13 @@ def test_send_user_message_to_peer_does_not_redeliver_stacked_user_rows(tmp_path
     _write_jsonl(codex_session, _codex_entries("handoff", "B response"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "codex", 2)
-    write_delivery_cursor(workspace, "claude", 0)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=0,
+        codex_delivery=2,
+        claude_delivery=0,
+    )
 
     sent_messages: list[str] = []
 
@@ -519,7 +604,7 @@ def test_send_user_message_to_peer_does_not_redeliver_stacked_user_rows(tmp_path
         workspace_root=workspace,
         participants=participants,
         paste_content=lambda pane, content: sent_messages.append(content),
-        pane_alive=lambda pane: True,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.05, turn_timeout_seconds=5),
     )
 
@@ -534,13 +619,9 @@ def test_send_user_message_to_peer_does_not_redeliver_stacked_user_rows(tmp_path
 
 
 def test_send_user_message_to_peer_after_halt_responder_first_keeps_full_context(
-    tmp_path,
+    tmp_path, workspace
 ):
     """Peer receives unrouted final response plus responder-first post-halt exchange."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
     codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(
@@ -580,17 +661,20 @@ def test_send_user_message_to_peer_after_halt_responder_first_keeps_full_context
     _write_jsonl(codex_session, _codex_entries("seed", "seed"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 0)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=0,
+        codex_delivery=0,
+        claude_delivery=0,
+    )
 
     sent_messages: list[str] = []
     router = Router(
         workspace_root=workspace,
         participants=participants,
         paste_content=lambda pane, content: sent_messages.append(content),
-        pane_alive=lambda pane: True,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.05, turn_timeout_seconds=5),
     )
 
@@ -611,21 +695,20 @@ def test_send_user_message_to_peer_after_halt_responder_first_keeps_full_context
         start = index + len(fragment)
 
 
-def test_send_user_message_stamps_sent_at_before_paste(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
+def test_send_user_message_stamps_sent_at_before_paste(
+    tmp_path, workspace, codex_session
+):
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(claude_session, [])
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "claude", 3)
-    write_delivery_cursor(workspace, "codex", 0)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     paste_seen_at: datetime | None = None
     pasted_payload: str | None = None
@@ -640,7 +723,7 @@ def test_send_user_message_stamps_sent_at_before_paste(tmp_path):
         workspace_root=workspace,
         participants=participants,
         paste_content=_record_paste_time,
-        pane_alive=lambda pane: True,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -651,22 +734,18 @@ def test_send_user_message_stamps_sent_at_before_paste(tmp_path):
     assert pasted_payload == "--- user ---\nhello"
 
 
-def test_send_routed_message_orders_interjections_chronologically(tmp_path):
+def test_send_routed_message_orders_interjections_chronologically(
+    workspace, claude_session, codex_session
+):
     """Payload order: delta rows, interjections, peer response."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
-    claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
-    _write_jsonl(claude_session, _claude_entries("task", "done"))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
-
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 2)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=2,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     sent_messages: list[str] = []
 
@@ -674,7 +753,7 @@ def test_send_routed_message_orders_interjections_chronologically(tmp_path):
         workspace_root=workspace,
         participants=participants,
         paste_content=lambda pane, content: sent_messages.append(content),
-        pane_alive=lambda pane: True,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -703,13 +782,10 @@ def test_send_routed_message_orders_interjections_chronologically(tmp_path):
     )
 
 
-def test_send_routed_message_strips_injected_headers_from_delta_user_rows(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
+def test_send_routed_message_strips_injected_headers_from_delta_user_rows(
+    tmp_path, workspace, codex_session
+):
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(
         claude_session,
         _claude_entries(
@@ -721,13 +797,15 @@ final instruction""",
             "done",
         ),
     )
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 2)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=2,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     sent_messages: list[str] = []
 
@@ -735,7 +813,7 @@ final instruction""",
         workspace_root=workspace,
         participants=participants,
         paste_content=lambda pane, content: sent_messages.append(content),
-        pane_alive=lambda pane: True,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -750,11 +828,7 @@ final instruction""",
     assert "--- codex ---\nprior analysis" not in sent_messages[0]
 
 
-def test_send_routed_message_ignores_header_only_echoed_user_row(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
+def test_send_routed_message_ignores_header_only_echoed_user_row(tmp_path, workspace):
     claude_session = tmp_path / "claude.jsonl"
     codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(claude_session, _claude_entries("ack", "ack"))
@@ -768,11 +842,14 @@ first response""",
     )
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 2)
-    write_read_cursor(workspace, "codex", 3)
     # delivery cursor before codex user row and assistant row
-    write_delivery_cursor(workspace, "claude", 1)
-    write_delivery_cursor(workspace, "codex", 2)
+    _set_cursors(
+        workspace,
+        claude_read=2,
+        codex_read=3,
+        codex_delivery=2,
+        claude_delivery=1,
+    )
 
     sent_messages: list[str] = []
 
@@ -780,7 +857,7 @@ first response""",
         workspace_root=workspace,
         participants=participants,
         paste_content=lambda pane, content: sent_messages.append(content),
-        pane_alive=lambda pane: True,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -797,11 +874,7 @@ first response""",
     assert "--- user ---" not in payload
 
 
-def test_send_routed_message_drops_echoed_routed_user_row(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
+def test_send_routed_message_drops_echoed_routed_user_row(tmp_path, workspace):
     claude_session = tmp_path / "claude.jsonl"
     codex_session = tmp_path / "codex.jsonl"
     routed_payload = """--- user ---
@@ -813,10 +886,13 @@ first response"""
     _write_jsonl(codex_session, _codex_entries(routed_payload, "codex analysis"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 2)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "claude", 0)
-    write_delivery_cursor(workspace, "codex", 2)
+    _set_cursors(
+        workspace,
+        claude_read=2,
+        codex_read=3,
+        codex_delivery=2,
+        claude_delivery=0,
+    )
 
     sent_messages: list[str] = []
 
@@ -824,7 +900,7 @@ first response"""
         workspace_root=workspace,
         participants=participants,
         paste_content=lambda pane, content: sent_messages.append(content),
-        pane_alive=lambda pane: True,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -844,12 +920,8 @@ first response"""
     )
 
 
-def test_send_routed_message_dedupes_only_first_echoed_user_row(tmp_path):
+def test_send_routed_message_dedupes_only_first_echoed_user_row(tmp_path, workspace):
     """When two identical user rows exist in delta, only the first is dropped."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
     codex_session = tmp_path / "codex.jsonl"
     routed_payload = "--- user ---\nrepeat me"
@@ -888,11 +960,14 @@ def test_send_routed_message_dedupes_only_first_echoed_user_row(tmp_path):
     _write_jsonl(codex_session, codex_entries)
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 2)
-    write_read_cursor(workspace, "codex", 4)
     # delivery cursor before the two user rows
-    write_delivery_cursor(workspace, "claude", 1)
-    write_delivery_cursor(workspace, "codex", 2)
+    _set_cursors(
+        workspace,
+        claude_read=2,
+        codex_read=4,
+        codex_delivery=2,
+        claude_delivery=1,
+    )
 
     sent_messages: list[str] = []
 
@@ -900,7 +975,7 @@ def test_send_routed_message_dedupes_only_first_echoed_user_row(tmp_path):
         workspace_root=workspace,
         participants=participants,
         paste_content=lambda pane, content: sent_messages.append(content),
-        pane_alive=lambda pane: True,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -921,27 +996,23 @@ def test_send_routed_message_dedupes_only_first_echoed_user_row(tmp_path):
     assert payload.count("--- user ---") == 1
 
 
-def test_sync_delivery_cursors_aligns_to_peer_read_positions(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
-    claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
-    _write_jsonl(claude_session, _claude_entries("task", "done"))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
-
+def test_sync_delivery_cursors_aligns_to_peer_read_positions(
+    workspace, claude_session, codex_session
+):
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 0)
-    write_delivery_cursor(workspace, "codex", 0)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=0,
+        codex_delivery=0,
+        claude_delivery=0,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -957,27 +1028,23 @@ def test_sync_delivery_cursors_aligns_to_peer_read_positions(tmp_path):
     assert read_delivery_cursor(workspace, "codex") == 2
 
 
-def test_sync_delivery_cursors_can_limit_targets(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
-    claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
-    _write_jsonl(claude_session, _claude_entries("task", "done"))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
-
+def test_sync_delivery_cursors_can_limit_targets(
+    workspace, claude_session, codex_session
+):
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 0)
-    write_delivery_cursor(workspace, "codex", 0)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=0,
+        codex_delivery=0,
+        claude_delivery=0,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -987,22 +1054,15 @@ def test_sync_delivery_cursors_can_limit_targets(tmp_path):
     assert read_delivery_cursor(workspace, "codex") == 2
 
 
-def test_sync_delivery_cursors_rejects_invalid_target(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
-    claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
-    _write_jsonl(claude_session, _claude_entries("task", "done"))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
-
+def test_sync_delivery_cursors_rejects_invalid_target(
+    workspace, claude_session, codex_session
+):
     participants = _participants(workspace, claude_session, codex_session)
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -1010,27 +1070,26 @@ def test_sync_delivery_cursors_rejects_invalid_target(tmp_path):
         router.sync_delivery_cursors(["invalid"])
 
 
-def test_refresh_source_skips_stuck_malformed_tail_after_retries(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
+def test_refresh_source_skips_stuck_malformed_tail_after_retries(
+    tmp_path, workspace, codex_session
+):
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(claude_session, [*_claude_entries("task", "done"), "{"])
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 2)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=2,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.05, turn_timeout_seconds=5),
     )
 
@@ -1042,14 +1101,314 @@ def test_refresh_source_skips_stuck_malformed_tail_after_retries(tmp_path):
     assert router.refresh_source("claude") == 3
 
 
-def test_wait_for_response_codex_requires_task_complete_when_started(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
+def test_refresh_source_reuses_extraction_for_unchanged_stuck_tail(
+    tmp_path, workspace, codex_session, monkeypatch
+):
+    claude_session = tmp_path / "claude.jsonl"
+    _write_jsonl(claude_session, [*_claude_entries("task", "done"), "{"])
+
+    participants = _participants(workspace, claude_session, codex_session)
+    _set_cursors(
+        workspace,
+        claude_read=2,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
+
+    import claodex.router as router_module
+
+    calls = {"n": 0}
+    original_extract = router_module.extract_room_events_from_window
+
+    def counting_extract(**kwargs):
+        calls["n"] += 1
+        return original_extract(**kwargs)
 
+    monkeypatch.setattr(
+        router_module, "extract_room_events_from_window", counting_extract
+    )
+
+    router = Router(
+        workspace_root=workspace,
+        participants=participants,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
+        config=RoutingConfig(poll_seconds=0.05, turn_timeout_seconds=5),
+    )
+
+    assert router.refresh_source("claude") == 2
+    assert router.refresh_source("claude") == 2
+    assert calls["n"] == 1
+
+    # appending a valid row changes the file signature and unsticks the cursor
+    with claude_session.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(_claude_entries("next", "")[0]) + "\n")
+    assert router.refresh_source("claude") == 4
+    assert calls["n"] == 2
+
+
+def test_refresh_source_indexes_line_completed_across_appends(
+    tmp_path, workspace, codex_session
+):
+    claude_session = tmp_path / "claude.jsonl"
+    user_row, assistant_row = (
+        json.dumps(entry) for entry in _claude_entries("task", "done")
+    )
+    _write_jsonl(claude_session, [user_row])
+    # assistant row is only partially flushed
+    with claude_session.open("a", encoding="utf-8") as handle:
+        handle.write(assistant_row[:20])
+
+    participants = _participants(workspace, claude_session, codex_session)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
+
+    router = Router(
+        workspace_root=workspace,
+        participants=participants,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
+        config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
+    )
+
+    assert router.refresh_source("claude") == 1
+
+    with claude_session.open("a", encoding="utf-8") as handle:
+        handle.write(assistant_row[20:] + "\n")
+
+    assert router.refresh_source("claude") == 2
+    events = router._extract_events_between("claude", start_line=0, end_line=2)
+    assert [event["body"] for event in events] == ["task", "done"]
+
+
+def test_refresh_source_reindexes_truncated_session(tmp_path, workspace, codex_session):
+    claude_session = tmp_path / "claude.jsonl"
+    _write_jsonl(
+        claude_session,
+        [*_claude_entries("old task", "old answer"), *_claude_entries("x", "y")],
+    )
+
+    participants = _participants(workspace, claude_session, codex_session)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
+
+    router = Router(
+        workspace_root=workspace,
+        participants=participants,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
+        config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
+    )
+    assert router.refresh_source("claude") == 4
+
+    # session rewritten with shorter contents; stale offsets must be dropped
+    _write_jsonl(claude_session, _claude_entries("new task", "new answer"))
+    write_read_cursor(workspace, "claude", 0)
+
+    assert router.refresh_source("claude") == 2
+    events = router._extract_events_between("claude", start_line=0, end_line=2)
+    assert [event["body"] for event in events] == ["new task", "new answer"]
+
+
+def test_refresh_source_keeps_handle_and_reopens_replaced_session(
+    tmp_path, workspace, codex_session
+):
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(claude_session, _claude_entries("task", "done"))
+
+    participants = _participants(workspace, claude_session, codex_session)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
+
+    router = Router(
+        workspace_root=workspace,
+        participants=participants,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
+        config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
+    )
+    assert router.refresh_source("claude") == 2
+    stream = router._tails["claude"].stream
+
+    with claude_session.open("a", encoding="utf-8") as handle:
+        for entry in _claude_entries("next", "reply"):
+            handle.write(json.dumps(entry) + "\n")
+    assert router.refresh_source("claude") == 4
+    assert router._tails["claude"].stream is stream
+
+    # atomic replace swaps the inode under the same path
+    replacement = tmp_path / "claude.jsonl.new"
+    _write_jsonl(replacement, _claude_entries("fresh", "start"))
+    os.replace(replacement, claude_session)
+    write_read_cursor(workspace, "claude", 0)
+
+    assert router.refresh_source("claude") == 2
+    assert stream.closed
+    events = router._extract_events_between("claude", start_line=0, end_line=2)
+    assert [event["body"] for event in events] == ["fresh", "start"]
+
+    router.close()
+    assert router._tails == {}
+    assert router.refresh_source("claude") == 2
+
+
+def test_refresh_tail_indexes_marker_lines_across_chunks_and_appends(
+    tmp_path, workspace, monkeypatch, claude_session
+):
+    # tiny reads split needles and rows across chunk boundaries
+    monkeypatch.setattr("claodex.router._READ_CHUNK_BYTES", 7)
+    codex_session = tmp_path / "codex.jsonl"
+    _write_jsonl(
+        codex_session,
+        _codex_turn_entries(
+            "task", "done", include_task_started=True, include_task_complete=True
+        ),
+    )
+
+    participants = _participants(workspace, claude_session, codex_session)
+    router = Router(
+        workspace_root=workspace,
+        participants=participants,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
+        config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
+    )
+    codex = participants.for_agent("codex")
+    raw_lines = codex_session.read_text(encoding="utf-8").splitlines()
+    expected = {
+        name: [
+            line
+            for line, raw in enumerate(raw_lines, start=1)
+            if f'"{name}"' in raw
+        ]
+        for name in ("task_started", "task_complete", "user", "assistant")
+    }
+
+    tail = router._refresh_tail(codex)
+    for name, lines in expected.items():
+        assert tail.marker_lines((name,), 0, len(raw_lines)) == lines
+
+    # a marker row written in two appends is indexed once its newline lands
+    marker_row = json.dumps(
+        {"type": "event_msg", "payload": {"type": "task_complete"}}
+    )
+    with codex_session.open("a", encoding="utf-8") as handle:
+        handle.write(marker_row[:20])
+    tail = router._refresh_tail(codex)
+    assert tail.marker_lines(("task_complete",), 0, tail.line_count) == (
+        expected["task_complete"]
+    )
+    with codex_session.open("a", encoding="utf-8") as handle:
+        handle.write(marker_row[20:] + "\n")
+    tail = router._refresh_tail(codex)
+    assert tail.marker_lines(("task_complete",), 0, tail.line_count) == [
+        *expected["task_complete"],
+        len(raw_lines) + 1,
+    ]
+
+
+def test_marker_scan_reuses_cached_row_kinds(
+    tmp_path, workspace, monkeypatch, claude_session
+):
+    codex_session = tmp_path / "codex.jsonl"
+    _write_jsonl(
+        codex_session,
+        _codex_turn_entries(
+            "task", "done", include_task_started=True, include_task_complete=False
+        ),
+    )
+
+    participants = _participants(workspace, claude_session, codex_session)
+    router = Router(
+        workspace_root=workspace,
+        participants=participants,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
+        config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
+    )
+    codex = participants.for_agent("codex")
+    line_count = router._refresh_tail(codex).line_count
+
+    import claodex.router as router_module
+
+    parse_calls = 0
+    original_parse = router_module._parse_jsonl_entry
+
+    def counting_parse(raw_line):
+        nonlocal parse_calls
+        parse_calls += 1
+        return original_parse(raw_line)
+
+    monkeypatch.setattr(router_module, "_parse_jsonl_entry", counting_parse)
+
+    scan = router._scan_codex_turn_end_marker(codex, 0, line_count)
+    assert scan.marker_line is None
+    assert scan.saw_codex_task_started is True
+    assert parse_calls == 1
+
+    # an idle re-poll over the same window decodes nothing
+    scan = router._scan_codex_turn_end_marker(codex, 0, line_count)
+    assert scan.saw_codex_task_started is True
+    assert parse_calls == 1
+
+    with codex_session.open("a", encoding="utf-8") as handle:
+        handle.write(
+            json.dumps({"type": "event_msg", "payload": {"type": "task_complete"}})
+            + "\n"
+        )
+    scan = router._scan_codex_turn_end_marker(codex, 0, line_count + 1)
+    assert scan.marker_line == line_count + 1
+    assert parse_calls == 2
+
+
+def test_iter_session_rows_streams_window_and_skips_bad_rows(
+    tmp_path, workspace, codex_session
+):
+    claude_session = tmp_path / "claude.jsonl"
+    entries = _claude_entries("task", "done")
+    _write_jsonl(claude_session, [entries[0], "{", "", "[1]", entries[1]])
+    # unterminated final row is still part of the window
+    with claude_session.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(entries[0]))
+
+    participants = _participants(workspace, claude_session, codex_session)
+    router = Router(
+        workspace_root=workspace,
+        participants=participants,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
+        config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
+    )
+    claude = participants.for_agent("claude")
+
+    rows = list(router._iter_session_rows(claude, 0, 6, markers=("user", "assistant")))
+    assert [line for line, _ in rows] == [1, 5, 6]
+    assert [entry["type"] for _, entry in rows] == ["user", "assistant", "user"]
+
+    rows = list(router._iter_session_rows(claude, 1, 5, markers=("assistant",)))
+    assert [line for line, _ in rows] == [5]
+
+
+def test_wait_for_response_codex_requires_task_complete_when_started(
+    tmp_path, workspace, claude_session
+):
+    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(
         codex_session,
         _codex_turn_entries(
@@ -1061,16 +1420,19 @@ def test_wait_for_response_codex_requires_task_complete_when_started(tmp_path):
     )
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 2)
-    write_read_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "codex", 2)
-    write_delivery_cursor(workspace, "claude", 0)
+    _set_cursors(
+        workspace,
+        claude_read=2,
+        codex_read=0,
+        codex_delivery=2,
+        claude_delivery=0,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -1081,14 +1443,10 @@ def test_wait_for_response_codex_requires_task_complete_when_started(tmp_path):
         router.wait_for_response(pending=pending, timeout_seconds=0.2)
 
 
-def test_wait_for_response_codex_smoke_when_assistant_has_no_markers(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
-    claude_session = tmp_path / "claude.jsonl"
+def test_wait_for_response_codex_smoke_when_assistant_has_no_markers(
+    tmp_path, workspace, claude_session
+):
     codex_session = tmp_path / "codex.jsonl"
-    _write_jsonl(claude_session, _claude_entries("task", "done"))
     _write_jsonl(
         codex_session,
         _codex_turn_entries(
@@ -1100,16 +1458,19 @@ def test_wait_for_response_codex_smoke_when_assistant_has_no_markers(tmp_path):
     )
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 2)
-    write_read_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "codex", 2)
-    write_delivery_cursor(workspace, "claude", 0)
+    _set_cursors(
+        workspace,
+        claude_read=2,
+        codex_read=0,
+        codex_delivery=2,
+        claude_delivery=0,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -1123,14 +1484,10 @@ def test_wait_for_response_codex_smoke_when_assistant_has_no_markers(tmp_path):
         router.wait_for_response(pending=pending, timeout_seconds=0.2)
 
 
-def test_wait_for_response_codex_accepts_task_complete(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
-    claude_session = tmp_path / "claude.jsonl"
+def test_wait_for_response_codex_accepts_task_complete(
+    tmp_path, workspace, claude_session
+):
     codex_session = tmp_path / "codex.jsonl"
-    _write_jsonl(claude_session, _claude_entries("task", "done"))
     _write_jsonl(
         codex_session,
         _codex_turn_entries(
@@ -1142,16 +1499,19 @@ def test_wait_for_response_codex_accepts_task_complete(tmp_path):
     )
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 2)
-    write_read_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "codex", 2)
-    write_delivery_cursor(workspace, "claude", 0)
+    _set_cursors(
+        workspace,
+        claude_read=2,
+        codex_read=0,
+        codex_delivery=2,
+        claude_delivery=0,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -1163,74 +1523,37 @@ def test_wait_for_response_codex_accepts_task_complete(tmp_path):
     assert response.text == "final response"
 
 
-def test_wait_for_response_codex_ignores_pre_start_task_complete(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
-    claude_session = tmp_path / "claude.jsonl"
+def test_wait_for_response_codex_ignores_pre_start_task_complete(
+    tmp_path, workspace, claude_session
+):
     codex_session = tmp_path / "codex.jsonl"
-    _write_jsonl(claude_session, _claude_entries("task", "done"))
     _write_jsonl(
         codex_session,
-        [
-            {
-                "timestamp": "2026-02-22T10:00:00Z",
-                "type": "session_meta",
-                "payload": {"id": "codex-session", "cwd": "ignored"},
-            },
-            {
-                "timestamp": "2026-02-22T10:00:01Z",
-                "type": "event_msg",
-                "payload": {"type": "user_message", "message": "old question"},
-            },
-            {
-                "timestamp": "2026-02-22T10:00:02Z",
-                "type": "response_item",
-                "payload": {
-                    "type": "message",
-                    "role": "assistant",
-                    "content": [{"type": "output_text", "text": "old response"}],
-                },
-            },
-            {
-                "timestamp": "2026-02-22T10:00:03Z",
-                "type": "event_msg",
-                "payload": {"type": "task_complete"},
-            },
-            {
-                "timestamp": "2026-02-22T10:00:04Z",
-                "type": "event_msg",
-                "payload": {"type": "task_started"},
-            },
-            {
-                "timestamp": "2026-02-22T10:00:05Z",
-                "type": "event_msg",
-                "payload": {"type": "user_message", "message": "new question"},
-            },
-            {
-                "timestamp": "2026-02-22T10:00:06Z",
-                "type": "response_item",
-                "payload": {
-                    "type": "message",
-                    "role": "assistant",
-                    "content": [{"type": "output_text", "text": "new response"}],
-                },
-            },
-        ],
+        _codex_prev_turn_entries("old question", "old response")
+        + _codex_turn_entries(
+            "new question",
+            "new response",
+            include_task_started=True,
+            include_task_complete=False,
+            include_session_meta=False,
+            start_second=4,
+        ),
     )
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 2)
-    write_read_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "codex", 2)
-    write_delivery_cursor(workspace, "claude", 0)
+    _set_cursors(
+        workspace,
+        claude_read=2,
+        codex_read=0,
+        codex_delivery=2,
+        claude_delivery=0,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -1241,27 +1564,26 @@ def test_wait_for_response_codex_ignores_pre_start_task_complete(tmp_path):
         router.wait_for_response(pending=pending, timeout_seconds=0.2)
 
 
-def test_wait_for_response_claude_waits_for_tool_completion(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
+def test_wait_for_response_claude_waits_for_tool_completion(
+    tmp_path, workspace, codex_session
+):
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(claude_session, _claude_tool_entries(tool_complete=False))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -1275,27 +1597,26 @@ def test_wait_for_response_claude_waits_for_tool_completion(tmp_path):
         router.wait_for_response(pending=pending, timeout_seconds=0.2)
 
 
-def test_wait_for_response_claude_returns_after_tool_result(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
+def test_wait_for_response_claude_returns_after_tool_result(
+    tmp_path, workspace, codex_session
+):
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(claude_session, _claude_tool_entries(tool_complete=True))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -1307,27 +1628,26 @@ def test_wait_for_response_claude_returns_after_tool_result(tmp_path):
     assert response.text == "tests passed"
 
 
-def test_wait_for_response_claude_simple_turn_duration(tmp_path):
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
+def test_wait_for_response_claude_simple_turn_duration(
+    tmp_path, workspace, codex_session
+):
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(claude_session, _claude_turn_entries("design api", "simple answer"))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -1339,14 +1659,11 @@ def test_wait_for_response_claude_simple_turn_duration(tmp_path):
     assert response.text == "simple answer"
 
 
-def test_wait_for_response_claude_end_turn_stop_reason(tmp_path):
+def test_wait_for_response_claude_end_turn_stop_reason(
+    tmp_path, workspace, codex_session
+):
     """Claude turn detected via assistant stop_reason=end_turn (v2.1.77+ format)."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     # no turn_duration entry — only stop_reason: "end_turn" on the assistant
     _write_jsonl(
         claude_session,
@@ -1369,19 +1686,21 @@ def test_wait_for_response_claude_end_turn_stop_reason(tmp_path):
             },
         ],
     )
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -1393,14 +1712,11 @@ def test_wait_for_response_claude_end_turn_stop_reason(tmp_path):
     assert response.text == "here is the design"
 
 
-def test_poll_for_response_claude_end_turn_stop_reason(tmp_path):
+def test_poll_for_response_claude_end_turn_stop_reason(
+    tmp_path, workspace, codex_session
+):
     """poll_for_response detects Claude turn via stop_reason=end_turn (v2.1.77+)."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     # no turn_duration entry — only stop_reason: "end_turn" on the assistant
     _write_jsonl(
         claude_session,
@@ -1423,19 +1739,21 @@ def test_poll_for_response_claude_end_turn_stop_reason(tmp_path):
             },
         ],
     )
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -1492,14 +1810,11 @@ def _claude_split_turn_entries(
     ]
 
 
-def test_wait_for_response_claude_split_end_turn_frames(tmp_path):
+def test_wait_for_response_claude_split_end_turn_frames(
+    tmp_path, workspace, codex_session
+):
     """wait_for_response handles a 2.1.101 split-frame turn (thinking + text)."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(
         claude_session,
         _claude_split_turn_entries(
@@ -1508,19 +1823,21 @@ def test_wait_for_response_claude_split_end_turn_frames(tmp_path):
             visible_text="hey codex\n\n[COLLAB]",
         ),
     )
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -1536,7 +1853,9 @@ def test_wait_for_response_claude_split_end_turn_frames(tmp_path):
     assert _last_line_is(response.text, COLLAB_SIGNAL)
 
 
-def test_poll_for_response_claude_split_end_turn_frames(tmp_path):
+def test_poll_for_response_claude_split_end_turn_frames(
+    tmp_path, workspace, codex_session
+):
     """poll_for_response handles a 2.1.101 split-frame turn (thinking + text).
 
     Regression: `_scan_claude_turn_end_marker` used to latch onto the first
@@ -1544,12 +1863,7 @@ def test_poll_for_response_claude_split_end_turn_frames(tmp_path):
     before the text frame, causing `poll_for_response` to return None and
     `[COLLAB]` signals to be missed.
     """
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(
         claude_session,
         _claude_split_turn_entries(
@@ -1558,19 +1872,21 @@ def test_poll_for_response_claude_split_end_turn_frames(tmp_path):
             visible_text="hey codex\n\n[COLLAB]",
         ),
     )
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -1586,7 +1902,9 @@ def test_poll_for_response_claude_split_end_turn_frames(tmp_path):
     assert _last_line_is(result.text, COLLAB_SIGNAL)
 
 
-def test_wait_for_response_claude_split_end_turn_streaming_race(tmp_path):
+def test_wait_for_response_claude_split_end_turn_streaming_race(
+    tmp_path, workspace, codex_session
+):
     """wait_for_response recovers when the text frame lands after the thinking frame.
 
     Regression: under Claude Code v2.1.101, a streaming turn flushes its
@@ -1596,12 +1914,7 @@ def test_wait_for_response_claude_split_end_turn_streaming_race(tmp_path):
     returned None for the window ending at the thinking frame. The fix
     defers on orphan markers and lets a later scan pick up the text frame.
     """
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     split = _claude_split_turn_entries(
         user_text="kick off the collab",
         thinking_text="planning the reply",
@@ -1609,13 +1922,15 @@ def test_wait_for_response_claude_split_end_turn_streaming_race(tmp_path):
     )
     # write only the user row + thinking frame to start the race
     _write_jsonl(claude_session, split[:2])
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     # use pane_alive as a deterministic "append after first iteration" hook
     # so the text frame lands between poll #1 and poll #2 without timing
@@ -1633,7 +1948,7 @@ def test_wait_for_response_claude_split_end_turn_streaming_race(tmp_path):
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
+        paste_content=_noop_paste,
         pane_alive=pane_alive_with_delayed_append,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=2),
     )
@@ -1652,19 +1967,16 @@ def test_wait_for_response_claude_split_end_turn_streaming_race(tmp_path):
     assert pane_alive_calls["n"] >= 2
 
 
-def test_wait_for_response_claude_split_orphan_marker_timeout(tmp_path):
+def test_wait_for_response_claude_split_orphan_marker_timeout(
+    tmp_path, workspace, codex_session
+):
     """wait_for_response raises a distinct SMOKE SIGNAL when the text frame never lands.
 
     If only the thinking frame is ever flushed to the JSONL, the loop must
     time out with a clearly labeled error that points at the orphan marker
     instead of the generic "no marker arrived" message.
     """
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     split = _claude_split_turn_entries(
         user_text="kick off the collab",
         thinking_text="planning the reply",
@@ -1672,19 +1984,21 @@ def test_wait_for_response_claude_split_orphan_marker_timeout(tmp_path):
     )
     # write only the user row + thinking frame and leave it there
     _write_jsonl(claude_session, split[:2])
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -1700,19 +2014,16 @@ def test_wait_for_response_claude_split_orphan_marker_timeout(tmp_path):
         router.wait_for_response(pending=pending, timeout_seconds=0.1)
 
 
-def test_poll_for_response_claude_split_thinking_only_defers(tmp_path):
+def test_poll_for_response_claude_split_thinking_only_defers(
+    tmp_path, workspace, codex_session
+):
     """When only the thinking frame has landed, poll should defer, not latch.
 
     In the streaming race where the thinking frame is flushed to disk before
     the text frame, `poll_for_response` must return None so the next poll can
     re-scan the window once the text frame appears.
     """
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     # only the user row and the thinking frame are visible — no text frame yet
     split = _claude_split_turn_entries(
         user_text="kick off the collab",
@@ -1720,19 +2031,21 @@ def test_poll_for_response_claude_split_thinking_only_defers(tmp_path):
         visible_text="hey codex\n\n[COLLAB]",
     )
     _write_jsonl(claude_session, split[:2])
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -1754,17 +2067,13 @@ def test_poll_for_response_claude_split_thinking_only_defers(tmp_path):
     assert result.text == "hey codex\n\n[COLLAB]"
 
 
-def test_wait_for_response_claude_stop_event_fallback(tmp_path):
+def test_wait_for_response_claude_stop_event_fallback(
+    tmp_path, workspace, codex_session
+):
     """Claude turn without turn_duration is detected via debug-log Stop event."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     # no turn_duration entry — just user + assistant
     _write_jsonl(claude_session, _claude_entries("hello", "hey there"))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     # write a debug log with a Stop event
     debug_dir = tmp_path / "debug"
@@ -1775,16 +2084,19 @@ def test_wait_for_response_claude_stop_event_fallback(tmp_path):
     )
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -1806,14 +2118,11 @@ def test_wait_for_response_claude_stop_event_fallback(tmp_path):
         router_module.CLAUDE_DEBUG_LOG_PATTERN = original_pattern
 
 
-def test_wait_for_response_claude_stop_event_no_assistant_text(tmp_path):
+def test_wait_for_response_claude_stop_event_no_assistant_text(
+    tmp_path, workspace, codex_session
+):
     """Stop event fires but no assistant text after anchor — should timeout, not succeed."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     # only a user entry, no assistant response
     _write_jsonl(
         claude_session,
@@ -1826,7 +2135,6 @@ def test_wait_for_response_claude_stop_event_no_assistant_text(tmp_path):
             },
         ],
     )
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     debug_dir = tmp_path / "debug"
     debug_dir.mkdir()
@@ -1836,16 +2144,19 @@ def test_wait_for_response_claude_stop_event_no_assistant_text(tmp_path):
     )
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -1865,16 +2176,12 @@ def test_wait_for_response_claude_stop_event_no_assistant_text(tmp_path):
         router_module.CLAUDE_DEBUG_LOG_PATTERN = original_pattern
 
 
-def test_wait_for_response_claude_stop_event_ignores_stale(tmp_path):
+def test_wait_for_response_claude_stop_event_ignores_stale(
+    tmp_path, workspace, codex_session
+):
     """Stop events from before send_time are ignored."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(claude_session, _claude_entries("hello", "hey there"))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     # write a stale Stop event from 2020
     debug_dir = tmp_path / "debug"
@@ -1885,16 +2192,19 @@ def test_wait_for_response_claude_stop_event_ignores_stale(tmp_path):
     )
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -1915,16 +2225,12 @@ def test_wait_for_response_claude_stop_event_ignores_stale(tmp_path):
         router_module.CLAUDE_DEBUG_LOG_PATTERN = original_pattern
 
 
-def test_wait_for_response_claude_stop_event_same_millisecond_as_send_time(tmp_path):
+def test_wait_for_response_claude_stop_event_same_millisecond_as_send_time(
+    tmp_path, workspace, codex_session
+):
     """Stop event with millisecond precision is accepted for same-ms send_time."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(claude_session, _claude_entries("hello", "hey there"))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     debug_dir = tmp_path / "debug"
     debug_dir.mkdir()
@@ -1934,16 +2240,19 @@ def test_wait_for_response_claude_stop_event_same_millisecond_as_send_time(tmp_p
     )
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -1967,14 +2276,54 @@ def test_wait_for_response_claude_stop_event_same_millisecond_as_send_time(tmp_p
         router_module.CLAUDE_DEBUG_LOG_PATTERN = original_pattern
 
 
-def test_wait_for_response_claude_interference_detection(tmp_path):
-    """Unexpected user input during collab wait triggers interference error."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
+def test_scan_claude_debug_stop_event_matches_line_split_across_writes(
+    tmp_path, workspace, monkeypatch, claude_session, codex_session
+):
+    debug_log = tmp_path / "debug" / "claude-session.txt"
+    debug_log.parent.mkdir()
+    monkeypatch.setattr(
+        "claodex.router.CLAUDE_DEBUG_LOG_PATTERN",
+        str(debug_log).replace("claude-session", "{session_id}"),
+    )
+
+    participants = _participants(workspace, claude_session, codex_session)
+    router = Router(
+        workspace_root=workspace,
+        participants=participants,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
+        config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
+    )
+    claude = participants.for_agent("claude")
+    send_time = datetime(2026, 2, 22, 10, 0, 0, tzinfo=timezone.utc)
+    stop_line = (
+        "2026-02-22T10:00:01.000Z [DEBUG] Getting matching hook commands for Stop"
+        " with query: undefined\n"
+    )
+
+    assert router._scan_claude_debug_stop_event(claude, send_time) is False
+
+    debug_log.write_text("2026-02-22T10:00:00.500Z [DEBUG] other\n" + stop_line[:40])
+    assert router._scan_claude_debug_stop_event(claude, send_time) is False
+
+    with debug_log.open("a", encoding="utf-8") as handle:
+        handle.write(stop_line[40:])
+    assert router._scan_claude_debug_stop_event(claude, send_time) is True
+    # consumed lines are not reported again
+    assert router._scan_claude_debug_stop_event(claude, send_time) is False
 
+    # a rotated log is read from the top
+    rotated = debug_log.with_suffix(".new")
+    rotated.write_text(stop_line)
+    os.replace(rotated, debug_log)
+    assert router._scan_claude_debug_stop_event(claude, send_time) is True
+
+
+def test_wait_for_response_claude_interference_detection(
+    tmp_path, workspace, codex_session
+):
+    """Unexpected user input during collab wait triggers interference error."""
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     # two non-meta user entries: our injected message + an accidental direct input
     _write_jsonl(
         claude_session,
@@ -2002,19 +2351,21 @@ def test_wait_for_response_claude_interference_detection(tmp_path):
             },
         ],
     )
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -2027,14 +2378,11 @@ def test_wait_for_response_claude_interference_detection(tmp_path):
         router.wait_for_response(pending=pending, timeout_seconds=0.5)
 
 
-def test_wait_for_response_claude_meta_rows_not_interference(tmp_path):
+def test_wait_for_response_claude_meta_rows_not_interference(
+    tmp_path, workspace, codex_session
+):
     """Meta user rows (command wrappers, system reminders) do not trigger interference."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     # our injected message + a meta user row (system-reminder) + assistant response + turn_duration
     _write_jsonl(
         claude_session,
@@ -2071,19 +2419,21 @@ def test_wait_for_response_claude_meta_rows_not_interference(tmp_path):
             },
         ],
     )
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -2097,14 +2447,11 @@ def test_wait_for_response_claude_meta_rows_not_interference(tmp_path):
     assert response.text == "correct response"
 
 
-def test_wait_for_response_claude_interference_wrong_first_row(tmp_path):
+def test_wait_for_response_claude_interference_wrong_first_row(
+    tmp_path, workspace, codex_session
+):
     """Non-matching first user row is detected as interference (out-of-band input before anchor)."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     # only row is out-of-band user input that doesn't match sent_text
     _write_jsonl(
         claude_session,
@@ -2126,19 +2473,21 @@ def test_wait_for_response_claude_interference_wrong_first_row(tmp_path):
             },
         ],
     )
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
@@ -2154,29 +2503,28 @@ def test_wait_for_response_claude_interference_wrong_first_row(tmp_path):
 # -- poll_for_response tests --
 
 
-def test_poll_for_response_returns_none_when_incomplete(tmp_path):
+def test_poll_for_response_returns_none_when_incomplete(
+    tmp_path, workspace, codex_session
+):
     """poll_for_response returns None when the agent hasn't finished."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     # only user entry, no assistant response or turn marker
     _write_jsonl(claude_session, _claude_entries("hello", "")[:1])
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -2187,28 +2535,27 @@ def test_poll_for_response_returns_none_when_incomplete(tmp_path):
     assert result is None
 
 
-def test_poll_for_response_returns_response_when_complete(tmp_path):
+def test_poll_for_response_returns_response_when_complete(
+    tmp_path, workspace, codex_session
+):
     """poll_for_response returns ResponseTurn when the agent has finished."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(claude_session, _claude_turn_entries("hello", "world"))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -2221,27 +2568,26 @@ def test_poll_for_response_returns_response_when_complete(tmp_path):
     assert result.text == "world"
 
 
-def test_poll_for_response_returns_none_when_pane_dead(tmp_path):
+def test_poll_for_response_returns_none_when_pane_dead(
+    tmp_path, workspace, codex_session
+):
     """poll_for_response returns None when the agent pane is dead."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(claude_session, _claude_turn_entries("hello", "world"))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
+        paste_content=_noop_paste,
         pane_alive=lambda pane: False,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
@@ -2256,23 +2602,22 @@ def test_poll_for_response_returns_none_when_pane_dead(tmp_path):
 # -- stop-event latch across polls --
 
 
-def test_poll_for_response_stop_event_latch_survives_across_polls(tmp_path):
+def test_poll_for_response_stop_event_latch_survives_across_polls(
+    tmp_path, workspace, codex_session
+):
     """Stop event consumed on first poll is latched so second poll still detects completion."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     # user entry only — no assistant text yet, no turn_duration marker
     _write_jsonl(claude_session, _claude_entries("hello", "")[:1])
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     # write a fake stop event to a tmp debug log
     debug_log = tmp_path / "claude-session.txt"
@@ -2283,8 +2628,8 @@ def test_poll_for_response_stop_event_latch_survives_across_polls(tmp_path):
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -2323,14 +2668,11 @@ def test_poll_for_response_stop_event_latch_survives_across_polls(tmp_path):
         router_module.CLAUDE_DEBUG_LOG_PATTERN = original_pattern
 
 
-def test_poll_for_response_stop_event_skips_stale_pre_tool_result_text(tmp_path):
+def test_poll_for_response_stop_event_skips_stale_pre_tool_result_text(
+    tmp_path, workspace, codex_session
+):
     """Stop fallback ignores assistant text before a later tool_result user row."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     stale_entries = [
         {
             "timestamp": "2026-02-22T10:00:00Z",
@@ -2372,13 +2714,15 @@ def test_poll_for_response_stop_event_skips_stale_pre_tool_result_text(tmp_path)
         },
     ]
     _write_jsonl(claude_session, stale_entries)
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     debug_log = tmp_path / "claude-session.txt"
     debug_log.write_text(
@@ -2388,8 +2732,8 @@ def test_poll_for_response_stop_event_skips_stale_pre_tool_result_text(tmp_path)
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -2437,14 +2781,11 @@ def test_poll_for_response_stop_event_skips_stale_pre_tool_result_text(tmp_path)
         router_module.CLAUDE_DEBUG_LOG_PATTERN = original_pattern
 
 
-def test_poll_for_response_stop_event_ignores_meta_and_sidechain_entries(tmp_path):
+def test_poll_for_response_stop_event_ignores_meta_and_sidechain_entries(
+    tmp_path, workspace, codex_session
+):
     """Stop fallback ignores entry-level isMeta/isSidechain rows."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(
         claude_session,
         [
@@ -2514,13 +2855,15 @@ def test_poll_for_response_stop_event_ignores_meta_and_sidechain_entries(tmp_pat
             },
         ],
     )
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     debug_log = tmp_path / "claude-session.txt"
     debug_log.write_text(
@@ -2530,8 +2873,8 @@ def test_poll_for_response_stop_event_ignores_meta_and_sidechain_entries(tmp_pat
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -2556,28 +2899,25 @@ def test_poll_for_response_stop_event_ignores_meta_and_sidechain_entries(tmp_pat
         router_module.CLAUDE_DEBUG_LOG_PATTERN = original_pattern
 
 
-def test_poll_stop_latch_cleaned_on_marker_success(tmp_path):
+def test_poll_stop_latch_cleaned_on_marker_success(tmp_path, workspace, codex_session):
     """Latch entry is cleaned up when marker-based detection succeeds."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(claude_session, _claude_turn_entries("hello", "world"))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -2597,28 +2937,25 @@ def test_poll_stop_latch_cleaned_on_marker_success(tmp_path):
 # -- clear_poll_latch --
 
 
-def test_clear_poll_latch_removes_matching_entry(tmp_path):
+def test_clear_poll_latch_removes_matching_entry(tmp_path, workspace, codex_session):
     """clear_poll_latch removes the targeted entry and leaves others intact."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     _write_jsonl(claude_session, _claude_entries("hi", "hey"))
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -2639,14 +2976,11 @@ def test_clear_poll_latch_removes_matching_entry(tmp_path):
 # -- empty [COLLAB] edge case --
 
 
-def test_poll_for_response_stop_event_empty_user_row_blocks_stale(tmp_path):
+def test_poll_for_response_stop_event_empty_user_row_blocks_stale(
+    tmp_path, workspace, codex_session
+):
     """Empty user/user row is a staleness boundary for stop-event fallback."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     entries = [
         {
             "timestamp": "2026-02-22T10:00:00Z",
@@ -2672,13 +3006,15 @@ def test_poll_for_response_stop_event_empty_user_row_blocks_stale(tmp_path):
         },
     ]
     _write_jsonl(claude_session, entries)
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     debug_log = tmp_path / "claude-session.txt"
     debug_log.write_text(
@@ -2688,8 +3024,8 @@ def test_poll_for_response_stop_event_empty_user_row_blocks_stale(tmp_path):
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -2736,14 +3072,11 @@ def test_poll_for_response_stop_event_empty_user_row_blocks_stale(tmp_path):
         router_module.CLAUDE_DEBUG_LOG_PATTERN = original_pattern
 
 
-def test_poll_for_response_stop_event_meta_user_row_blocks_stale(tmp_path):
+def test_poll_for_response_stop_event_meta_user_row_blocks_stale(
+    tmp_path, workspace, codex_session
+):
     """Meta-text user/user row is a staleness boundary for stop-event fallback."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     entries = [
         {
             "timestamp": "2026-02-22T10:00:00Z",
@@ -2772,13 +3105,15 @@ def test_poll_for_response_stop_event_meta_user_row_blocks_stale(tmp_path):
         },
     ]
     _write_jsonl(claude_session, entries)
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     debug_log = tmp_path / "claude-session.txt"
     debug_log.write_text(
@@ -2788,8 +3123,8 @@ def test_poll_for_response_stop_event_meta_user_row_blocks_stale(tmp_path):
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=1),
     )
 
@@ -2836,14 +3171,11 @@ def test_poll_for_response_stop_event_meta_user_row_blocks_stale(tmp_path):
         router_module.CLAUDE_DEBUG_LOG_PATTERN = original_pattern
 
 
-def test_wait_for_response_claude_stop_event_meta_user_boundary(tmp_path):
+def test_wait_for_response_claude_stop_event_meta_user_boundary(
+    tmp_path, workspace, codex_session
+):
     """wait_for_response with stop-event fallback respects meta user row boundary."""
-    workspace = tmp_path / "workspace"
-    workspace.mkdir()
-    ensure_state_layout(workspace)
-
     claude_session = tmp_path / "claude.jsonl"
-    codex_session = tmp_path / "codex.jsonl"
     # stale assistant text followed by meta user row, then fresh assistant text
     _write_jsonl(
         claude_session,
@@ -2883,7 +3215,6 @@ def test_wait_for_response_claude_stop_event_meta_user_boundary(tmp_path):
             },
         ],
     )
-    _write_jsonl(codex_session, _codex_entries("ack", "ack"))
 
     debug_log = tmp_path / "claude-session.txt"
     debug_log.write_text(
@@ -2891,16 +3222,19 @@ def test_wait_for_response_claude_stop_event_meta_user_boundary(tmp_path):
     )
 
     participants = _participants(workspace, claude_session, codex_session)
-    write_read_cursor(workspace, "claude", 0)
-    write_read_cursor(workspace, "codex", 3)
-    write_delivery_cursor(workspace, "codex", 0)
-    write_delivery_cursor(workspace, "claude", 3)
+    _set_cursors(
+        workspace,
+        claude_read=0,
+        codex_read=3,
+        codex_delivery=0,
+        claude_delivery=3,
+    )
 
     router = Router(
         workspace_root=workspace,
         participants=participants,
-        paste_content=lambda pane, content: None,
-        pane_alive=lambda pane: True,
+        paste_content=_noop_paste,
+        pane_alive=_always_alive,
         config=RoutingConfig(poll_seconds=0.01, turn_timeout_seconds=5),
     )
 
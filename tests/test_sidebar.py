@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import curses
 import json
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
 
 from claodex.sidebar import (
@@ -10,6 +11,7 @@ from claodex.sidebar import (
     SidebarApplication,
     _active_thinking_agent,
     _as_text,
+    _coalesce_segments,
     _collect_capped_output,
     _default_metrics_snapshot,
     _derive_completed_thinking_seconds,
@@ -19,10 +21,14 @@ from claodex.sidebar import (
     _load_metrics_snapshot,
     _looks_interactive_command,
     _mode_text,
+    _output_lines,
     _parse_iso8601,
     _parse_event_line,
     _status_text,
+    _sum_completed_thinking,
+    _thinking_agents,
     _uptime_text,
+    _wrap_line,
 )
 
 
@@ -49,6 +55,13 @@ def test_parse_event_line_rejects_invalid_rows():
     assert _parse_event_line(json.dumps({"ts": "2026-02-24T01:30:00+00:00"})) is None
 
 
+def test_parse_event_line_skips_decode_when_required_keys_are_absent():
+    with patch("claodex.sidebar._decode_event_json") as decode:
+        assert _parse_event_line('{"ts": "2026-02-24T01:30:00+00:00", "kind": "sent"}') is None
+        assert _parse_event_line('{"kind": "sent", "message": "x"}') is None
+    decode.assert_not_called()
+
+
 def test_load_metrics_snapshot_merges_known_fields(tmp_path):
     path = tmp_path / "metrics.json"
     path.write_text(
@@ -78,6 +91,22 @@ def test_load_metrics_snapshot_merges_known_fields(tmp_path):
     assert "unknown" not in merged
 
 
+def test_load_metrics_snapshot_ignores_malformed_agent_sections(tmp_path):
+    path = tmp_path / "metrics.json"
+    path.write_text(
+        json.dumps({"target": "codex", "agents": {"claude": "busy", "codex": {"bogus": 1}}}),
+        encoding="utf-8",
+    )
+    merged = _load_metrics_snapshot(path, _default_metrics_snapshot())
+    assert merged["target"] == "codex"
+    assert merged["agents"]["claude"]["status"] == "idle"
+    assert "bogus" not in merged["agents"]["codex"]
+
+    path.write_text(json.dumps({"agents": []}), encoding="utf-8")
+    merged = _load_metrics_snapshot(path, _default_metrics_snapshot())
+    assert merged["agents"] == _default_metrics_snapshot()["agents"]
+
+
 def test_load_metrics_snapshot_tolerates_missing_or_invalid_file(tmp_path):
     missing = tmp_path / "missing.json"
     current = _default_metrics_snapshot()
@@ -88,6 +117,52 @@ def test_load_metrics_snapshot_tolerates_missing_or_invalid_file(tmp_path):
     assert _load_metrics_snapshot(broken, current) == current
 
 
+def test_poll_metrics_decodes_only_when_file_changes(tmp_path):
+    app = SidebarApplication(tmp_path / "workspace")
+    app._metrics_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _poll() -> None:
+        app._last_metrics_poll = 0.0
+        app._poll_metrics()
+
+    with patch("claodex.sidebar._load_metrics_snapshot", wraps=_load_metrics_snapshot) as load:
+        _poll()
+        assert load.call_count == 0
+
+        app._metrics_path.write_text(json.dumps({"mode": "collab"}), encoding="utf-8")
+        _poll()
+        _poll()
+        assert load.call_count == 1
+        assert app._metrics["mode"] == "collab"
+
+        replacement = app._metrics_path.with_name("metrics.json.tmp")
+        replacement.write_text(json.dumps({"mode": "normal"}), encoding="utf-8")
+        replacement.replace(app._metrics_path)
+        _poll()
+        assert load.call_count == 2
+        assert app._metrics["mode"] == "normal"
+
+
+def test_default_metrics_snapshot_returns_independent_copies():
+    first = _default_metrics_snapshot()
+    first["mode"] = "collab"
+    first["agents"]["claude"]["status"] = "thinking"
+
+    second = _default_metrics_snapshot()
+    assert second["mode"] == "normal"
+    assert second["agents"]["claude"]["status"] == "idle"
+    assert second["agents"] is not first["agents"]
+
+
+def test_output_lines_tags_stderr_after_stdout():
+    assert list(_output_lines("one\ntwo\n", "bad\n", 100)) == [
+        "one",
+        "two",
+        "[stderr] bad",
+    ]
+    assert list(_output_lines("", "abcdef", 3)) == ["[stderr] abc", None]
+
+
 def test_collect_capped_output_limits_lines_and_bytes():
     lines, truncated = _collect_capped_output(
         stdout="one\ntwo\nthree\nfour\n",
@@ -108,9 +183,83 @@ def test_collect_capped_output_limits_lines_and_bytes():
     assert truncated is True
 
 
+def test_collect_capped_output_bounds_large_and_multibyte_output():
+    lines, truncated = _collect_capped_output(
+        stdout="ab\ncdefgh\n" + "x" * 100_000,
+        stderr="",
+        max_lines=10,
+        max_bytes=4,
+    )
+    assert lines == ["ab"]
+    assert truncated is True
+
+    lines, truncated = _collect_capped_output(
+        stdout="é\n",
+        stderr="err\n",
+        max_lines=10,
+        max_bytes=16,
+    )
+    assert lines == ["é", "[stderr] err"]
+    assert truncated is False
+
+    lines, truncated = _collect_capped_output(
+        stdout="éé\n",
+        stderr="",
+        max_lines=10,
+        max_bytes=4,
+    )
+    assert lines == []
+    assert truncated is True
+
+
+def test_collect_capped_output_handles_crlf_line_endings():
+    # 50 lines of 201 counted bytes fit; the 51st must not be a cut fragment
+    lines, truncated = _collect_capped_output(
+        stdout=("x" * 200 + "\r\n") * 60,
+        stderr="ERR\n",
+        max_lines=100,
+        max_bytes=10240,
+    )
+    assert lines == ["x" * 200] * 50
+    assert truncated is True
+
+    lines, truncated = _collect_capped_output(
+        stdout="a\r\nb\r\nccccc",
+        stderr="",
+        max_lines=10,
+        max_bytes=4,
+    )
+    assert lines == ["a", "b"]
+    assert truncated is True
+
+    # crlf lines are charged one terminator byte, so all five fit
+    lines, truncated = _collect_capped_output(
+        stdout="a\r\n" * 5,
+        stderr="",
+        max_lines=10,
+        max_bytes=10,
+    )
+    assert lines == ["a"] * 5
+    assert truncated is False
+
+
 def test_looks_interactive_command_detects_known_interactive_tools():
     assert _looks_interactive_command("vim notes.txt") is True
     assert _looks_interactive_command("echo hello") is False
+    assert _looks_interactive_command("emacs notes.txt") is True
+    assert _looks_interactive_command("python script.py") is False
+    # one-shot subcommands of multiplexers and man stay runnable
+    assert _looks_interactive_command("tmux ls") is False
+    assert _looks_interactive_command("screen -ls") is False
+    assert _looks_interactive_command("man -k foo") is False
+
+
+def test_looks_interactive_command_resolves_paths_and_quoting():
+    assert _looks_interactive_command("  /usr/bin/less  README.md") is True
+    assert _looks_interactive_command("'vim' notes.txt") is True
+    assert _looks_interactive_command('echo "vim"') is False
+    assert _looks_interactive_command("vim 'unterminated") is False
+    assert _looks_interactive_command("   ") is False
 
 
 def test_mode_and_uptime_text_format_collab_state():
@@ -167,12 +316,111 @@ def test_derive_inflight_thinking_seconds_uses_active_thinking_since():
     assert _derive_inflight_thinking_seconds(metrics, now=now) == 12.0
 
 
+def test_append_entry_keeps_aggregate_columns_aligned(tmp_path):
+    base = datetime(2026, 2, 24, 1, 30, 0, tzinfo=timezone.utc)
+    with patch("claodex.sidebar.LOG_BUFFER_MAX", 3):
+        app = SidebarApplication(tmp_path / "workspace")
+    entries = [
+        LogEntry(timestamp=base, kind="sent", message="-> claude", target="claude"),
+        LogEntry(timestamp=base.replace(second=4), kind="recv", message="<- claude", agent="claude"),
+        LogEntry(timestamp=base.replace(second=6), kind="sent", message="-> codex", target="codex"),
+        LogEntry(timestamp=base.replace(second=9), kind="recv", message="<- codex", agent="codex"),
+    ]
+    for entry in entries:
+        app._append_entry(entry)
+
+    # the oldest row is evicted from every column together
+    assert list(app._entry_kinds) == ["recv", "sent", "recv"]
+    assert list(app._entry_agents) == ["claude", "codex", "codex"]
+    assert app._turn_counts == _derive_turn_counts(entries[1:])
+    assert _sum_completed_thinking(
+        app._entry_kinds, app._entry_agents, app._entry_seconds
+    ) == _derive_completed_thinking_seconds(entries[1:])
+
+
+def test_turn_counts_track_appends_and_evictions(tmp_path):
+    base = datetime(2026, 2, 24, 1, 30, 0, tzinfo=timezone.utc)
+    with patch("claodex.sidebar.LOG_BUFFER_MAX", 2):
+        app = SidebarApplication(tmp_path / "workspace")
+
+    def _recv(agent: str) -> LogEntry:
+        return LogEntry(timestamp=base, kind="recv", message=f"<- {agent}", agent=agent)
+
+    app._append_entry(_recv("claude"))
+    app._append_entry(_recv("codex"))
+    assert app._turn_counts == {"claude": 1, "codex": 1}
+
+    app._append_entry(_recv("codex"))
+    assert app._turn_counts == {"claude": 0, "codex": 2}
+    assert app._turn_counts == _derive_turn_counts(app._entries)
+
+
+def test_completed_thinking_seconds_rescans_only_after_appends(tmp_path):
+    app = SidebarApplication(tmp_path / "workspace")
+    base = datetime(2026, 2, 24, 1, 30, 0, tzinfo=timezone.utc)
+    app._append_entry(LogEntry(timestamp=base, kind="sent", message="-> codex", target="codex"))
+    app._append_entry(
+        LogEntry(timestamp=base.replace(second=3), kind="recv", message="<- codex", agent="codex")
+    )
+
+    with patch("claodex.sidebar._sum_completed_thinking", wraps=_sum_completed_thinking) as scan:
+        assert app._completed_thinking_seconds() == 3.0
+        assert app._completed_thinking_seconds() == 3.0
+        assert scan.call_count == 1
+
+        app._append_entry(
+            LogEntry(timestamp=base.replace(second=5), kind="sent", message="-> codex", target="codex")
+        )
+        app._append_entry(
+            LogEntry(timestamp=base.replace(second=9), kind="recv", message="<- codex", agent="codex")
+        )
+        assert app._completed_thinking_seconds() == 7.0
+        assert scan.call_count == 2
+
+
+def test_thinking_agents_binds_per_agent_dicts():
+    metrics = _default_metrics_snapshot()
+    metrics["agents"]["codex"]["status"] = "thinking"
+    assert _thinking_agents(metrics) == [("codex", metrics["agents"]["codex"])]
+    assert _thinking_agents(metrics)[0][1] is metrics["agents"]["codex"]
+    assert _thinking_agents({"agents": "broken"}) == []
+
+
+def test_derive_thinking_seconds_compare_across_timezones():
+    base = datetime(2026, 2, 24, 1, 30, 0, tzinfo=timezone.utc)
+    offset = timezone(timedelta(hours=2))
+    entries = [
+        LogEntry(timestamp=base, kind="sent", message="-> claude", target="claude"),
+        LogEntry(
+            timestamp=base.replace(second=7).astimezone(offset),
+            kind="recv",
+            message="<- claude",
+            agent="claude",
+        ),
+    ]
+    assert _derive_completed_thinking_seconds(entries) == 7.0
+
+    metrics = _default_metrics_snapshot()
+    metrics["agents"]["codex"]["status"] = "thinking"
+    metrics["agents"]["codex"]["thinking_since"] = "2026-02-24T03:29:50+02:00"
+    assert _derive_inflight_thinking_seconds(metrics, now=base) == 10.0
+
+
 def test_format_elapsed_handles_boundary_and_large_values():
     assert _format_elapsed(0) == "0s"
     assert _format_elapsed(3600) == "1h00m"
     assert _format_elapsed(36610) == "10h10m"
 
 
+def test_format_elapsed_truncates_to_whole_seconds():
+    assert _format_elapsed(59.999) == "59s"
+    assert _format_elapsed(60) == "1m00s"
+    assert _format_elapsed(61.2) == "1m01s"
+    assert _format_elapsed(61.9) == "1m01s"
+    assert _format_elapsed(3599.9) == "59m59s"
+    assert _format_elapsed(-5) == "0s"
+
+
 def test_as_text_handles_none_bytes_and_string():
     assert _as_text(None) == ""
     assert _as_text(b"hello") == "hello"
@@ -185,6 +433,12 @@ def test_parse_iso8601_accepts_timezone_and_rejects_invalid_values():
     assert _parse_iso8601("2026-02-24T01:30:00") is None
 
 
+def test_parse_iso8601_accepts_z_suffix_as_utc():
+    parsed = _parse_iso8601("2026-02-24T01:30:00Z")
+    assert parsed == datetime(2026, 2, 24, 1, 30, 0, tzinfo=timezone.utc)
+    assert parsed.utcoffset() == timedelta(0)
+
+
 def test_read_event_lines_handles_partial_fragment_reassembly(tmp_path):
     workspace = tmp_path / "workspace"
     app = SidebarApplication(workspace)
@@ -198,6 +452,52 @@ def test_read_event_lines_handles_partial_fragment_reassembly(tmp_path):
     assert app._read_event_lines() == ["two", "three"]
 
 
+def test_read_event_lines_skips_unchanged_file_and_rereads_after_truncation(
+    tmp_path,
+):
+    workspace = tmp_path / "workspace"
+    app = SidebarApplication(workspace)
+    app._events_path.parent.mkdir(parents=True, exist_ok=True)
+
+    accent = "é".encode("utf-8")
+    app._events_path.write_bytes(b"one\ncaf" + accent[:1])
+    assert app._read_event_lines() == ["one"]
+
+    with app._events_path.open("ab") as handle:
+        handle.write(accent[1:] + b"\n")
+    assert app._read_event_lines() == ["café"]
+
+    with patch("claodex.sidebar.os.pread", side_effect=AssertionError("read")):
+        assert app._read_event_lines() == []
+
+    app._events_path.write_bytes(b"fresh\n")
+    assert app._read_event_lines() == ["fresh"]
+
+
+def test_read_event_lines_keeps_handle_and_reopens_replaced_file(tmp_path):
+    app = SidebarApplication(tmp_path / "workspace")
+    app._events_path.parent.mkdir(parents=True, exist_ok=True)
+    app._events_path.write_bytes(b"first\n")
+    assert app._read_event_lines() == ["first"]
+    stream = app._event_stream
+
+    with app._events_path.open("ab") as handle:
+        handle.write(b"second\n")
+    assert app._read_event_lines() == ["second"]
+    assert app._event_stream is stream
+
+    # a replacement longer than the old offset must still be read from zero
+    replacement = app._events_path.with_name("events.jsonl.new")
+    replacement.write_bytes(b"replaced-row-one\nreplaced-row-two\n")
+    replacement.replace(app._events_path)
+    assert app._read_event_lines() == ["replaced-row-one", "replaced-row-two"]
+    assert app._event_stream is not stream
+    assert stream.closed
+
+    app._close_event_stream()
+    assert app._event_stream is None
+
+
 def test_wrapped_log_lines_aligns_kind_and_continuation(tmp_path):
     workspace = tmp_path / "workspace"
     app = SidebarApplication(workspace)
@@ -216,6 +516,38 @@ def test_wrapped_log_lines_aligns_kind_and_continuation(tmp_path):
     assert wrapped[1][0].startswith(" " * len(prefix))
 
 
+def test_wrap_line_breaks_at_spaces_and_splits_long_words():
+    assert _wrap_line("", 5) == [""]
+    assert _wrap_line("fits", 4) == ["fits"]
+    assert _wrap_line("alpha beta gamma", 10) == ["alpha beta", "gamma"]
+    assert _wrap_line("abcdefghij klm", 4) == ["abcd", "efgh", "ij", "klm"]
+    assert _wrap_line("a\tb", 20) == ["a       b"]
+    assert all(len(chunk) <= 7 for chunk in _wrap_line("one two three four", 7))
+
+
+def test_wrapped_log_lines_prefix_entries_with_local_second(tmp_path):
+    workspace = tmp_path / "workspace"
+    app = SidebarApplication(workspace)
+    base = datetime(2026, 2, 24, 1, 30, 0, tzinfo=timezone.utc)
+    for timestamp in (
+        base,
+        base.replace(microsecond=900_000),
+        base.replace(second=1),
+    ):
+        app._entries.append(LogEntry(timestamp=timestamp, kind="sent", message="alpha"))
+
+    lines = app._wrapped_log_lines(width=80)
+    assert app._wrapped_log_lines(width=80) == lines
+
+    first_second = base.astimezone().strftime("%H:%M:%S")
+    next_second = base.replace(second=1).astimezone().strftime("%H:%M:%S")
+    assert [line.split(" ", 1)[0] for line, _attr in lines] == [
+        first_second,
+        first_second,
+        next_second,
+    ]
+
+
 def test_wrapped_log_lines_splits_multiline_messages(tmp_path):
     """Messages with embedded newlines produce separate rendered lines."""
     workspace = tmp_path / "workspace"
@@ -265,17 +597,20 @@ def test_handle_input_key_page_scroll_adjusts_offset(tmp_path):
     assert app._scroll_offset == 0
 
 
-def test_render_metrics_strip_drops_optional_fields_on_narrow_width(tmp_path):
-    class _StdScr:
-        def __init__(self) -> None:
-            self.calls: list[tuple[int, int, str]] = []
+class _StripScreen:
+    """Curses stub that records one row of `addnstr` text by column."""
 
-        def addnstr(self, row: int, column: int, text: str, _n: int, _attr: int) -> None:
-            self.calls.append((row, column, text))
+    def __init__(self, width: int = 256) -> None:
+        self.cells: list[str] = [""] * width
 
-    def _line_text(calls: list[tuple[int, int, str]]) -> str:
-        return "".join(text for _row, _column, text in sorted(calls, key=lambda item: item[1]))
+    def addnstr(self, _row: int, column: int, text: str, n: int, _attr: int) -> None:
+        self.cells[column] = text[:n]
 
+    def line_text(self) -> str:
+        return "".join(self.cells)
+
+
+def test_render_metrics_strip_drops_optional_fields_on_narrow_width(tmp_path):
     workspace = tmp_path / "workspace"
     app = SidebarApplication(workspace)
     app._metrics["mode"] = "collab"
@@ -283,36 +618,35 @@ def test_render_metrics_strip_drops_optional_fields_on_narrow_width(tmp_path):
     app._metrics["collab_max"] = 8
     app._metrics["agents"]["codex"]["status"] = "thinking"
     app._metrics["agents"]["codex"]["thinking_since"] = "2026-02-24T01:29:55+00:00"
-    app._entries.extend(
-        [
-            LogEntry(
-                timestamp=datetime(2026, 2, 24, 1, 29, 50, tzinfo=timezone.utc),
-                kind="recv",
-                message="<- claude",
-                agent="claude",
-            ),
-            LogEntry(
-                timestamp=datetime(2026, 2, 24, 1, 29, 51, tzinfo=timezone.utc),
-                kind="recv",
-                message="<- codex",
-                agent="codex",
-            ),
-        ]
-    )
+    for entry in (
+        LogEntry(
+            timestamp=datetime(2026, 2, 24, 1, 29, 50, tzinfo=timezone.utc),
+            kind="recv",
+            message="<- claude",
+            agent="claude",
+        ),
+        LogEntry(
+            timestamp=datetime(2026, 2, 24, 1, 29, 51, tzinfo=timezone.utc),
+            kind="recv",
+            message="<- codex",
+            agent="codex",
+        ),
+    ):
+        app._append_entry(entry)
     now = datetime(2026, 2, 24, 1, 30, 0, tzinfo=timezone.utc)
 
-    wide = _StdScr()
+    wide = _StripScreen()
     app._render_metrics_strip(wide, row=0, width=120, now=now)
-    wide_line = _line_text(wide.calls)
+    wide_line = wide.line_text()
     assert "collaborative" in wide_line
     assert "think " in wide_line
     assert "up " in wide_line
     assert "claude:1" in wide_line
     assert "codex:1" in wide_line
 
-    narrow = _StdScr()
+    narrow = _StripScreen()
     app._render_metrics_strip(narrow, row=0, width=30, now=now)
-    narrow_line = _line_text(narrow.calls)
+    narrow_line = narrow.line_text()
     assert "collaborative" in narrow_line
     assert "think " not in narrow_line
     assert "up " not in narrow_line
@@ -320,30 +654,25 @@ def test_render_metrics_strip_drops_optional_fields_on_narrow_width(tmp_path):
     assert "codex:" not in narrow_line
 
 
-def test_render_metrics_strip_spinner_uses_ascii_frames(tmp_path):
-    class _StdScr:
-        def __init__(self) -> None:
-            self.calls: list[tuple[int, int, str]] = []
-
-        def addnstr(self, row: int, column: int, text: str, _n: int, _attr: int) -> None:
-            self.calls.append((row, column, text))
+def test_coalesce_segments_merges_adjacent_attributes():
+    segments = [("a", 1), (" | ", 2), ("b", 2), ("c", 1), ("", 1), ("d", 1)]
+    assert _coalesce_segments(segments) == [("a", 1), (" | b", 2), ("c", 1)]
 
-    def _line_text(calls: list[tuple[int, int, str]]) -> str:
-        return "".join(text for _row, _column, text in sorted(calls, key=lambda item: item[1]))
 
+def test_render_metrics_strip_spinner_uses_ascii_frames(tmp_path):
     workspace = tmp_path / "workspace"
     app = SidebarApplication(workspace)
     app._metrics["agents"]["claude"]["status"] = "thinking"
     app._metrics["agents"]["claude"]["thinking_since"] = "2026-02-24T01:29:55+00:00"
 
     now = datetime(2026, 2, 24, 1, 30, 0, tzinfo=timezone.utc)
-    frame_one = _StdScr()
+    frame_one = _StripScreen()
     app._render_metrics_strip(frame_one, row=0, width=80, now=now)
-    frame_two = _StdScr()
+    frame_two = _StripScreen()
     app._render_metrics_strip(frame_two, row=0, width=80, now=now)
 
-    assert _line_text(frame_one.calls).startswith("⣷ claude")
-    assert _line_text(frame_two.calls).startswith("⣯ claude")
+    assert frame_one.line_text().startswith("⣷ claude")
+    assert frame_two.line_text().startswith("⣯ claude")
 
 
 def test_render_log_applies_scroll_offset_and_clamps(tmp_path):
@@ -454,6 +783,8 @@ def test_draw_scrollbar_places_thumb_at_bottom_when_at_tail():
 
     bold_rows = [row for row, _column, _char, attr in stdscr.calls if attr == curses.A_BOLD]
     assert bold_rows == [12, 13]
+    # each row is drawn once, with the thumb attribute or the track attribute
+    assert [row for row, _column, _char, _attr in stdscr.calls] == [10, 11, 12, 13]
 
 
 def test_draw_scrollbar_places_thumb_at_top_when_scrolled_to_oldest():
@@ -480,15 +811,16 @@ def test_draw_scrollbar_places_thumb_at_top_when_scrolled_to_oldest():
     assert bold_rows == [10, 11]
 
 
-def test_append_shell_entry_uses_timezone_aware_local_timestamp(tmp_path):
+def test_append_shell_entry_stamps_current_aware_utc_time(tmp_path):
     workspace = tmp_path / "workspace"
     app = SidebarApplication(workspace)
     app._append_shell_entry("echo hello")
 
     entry = app._entries[-1]
     assert entry.kind == "shell"
-    assert entry.timestamp.tzinfo is not None
-    assert entry.timestamp.utcoffset() is not None
+    assert entry.timestamp.utcoffset() == timedelta(0)
+    # the displayed clock is localized from epoch seconds, not from tzinfo
+    assert abs(entry.timestamp.timestamp() - time.time()) < 60
 
 
 def test_run_clears_scrollback_before_starting_curses(tmp_path):
@@ -9,11 +9,13 @@ from claodex.errors import ClaodexError
 from claodex.skill.scripts import register
 from claodex.tmux_ops import (
     PaneLayout,
+    _run_tmux_chain,
     _submit_delay,
     create_session,
     paste_content,
     prefill_skill_commands,
     resolve_layout,
+    start_agent_processes,
     start_sidebar_process,
     verify_prefill,
 )
@@ -40,14 +42,13 @@ def test_paste_content_uses_load_buffer_and_paste_buffer(monkeypatch):
 
     # load-buffer via subprocess.run with stdin input
     assert len(subprocess_calls) == 1
-    assert subprocess_calls[0]["args"] == ["tmux", "load-buffer", "-"]
+    assert subprocess_calls[0]["args"] == [
+        "tmux", "load-buffer", "-", ";", "paste-buffer", "-p", "-t", "%1",
+    ]
     assert subprocess_calls[0]["input"] == "--- user ---\nhello"
 
-    # paste-buffer + send-keys via _run_tmux
-    assert tmux_calls == [
-        ["paste-buffer", "-p", "-t", "%1"],
-        ["send-keys", "-t", "%1", "C-m"],
-    ]
+    # submit via _run_tmux after the settle delay
+    assert tmux_calls == [["send-keys", "-t", "%1", "C-m"]]
 
 
 def test_paste_content_raises_when_load_buffer_fails(monkeypatch):
@@ -82,10 +83,13 @@ def test_prefill_skill_commands_types_without_submitting(monkeypatch):
         PaneLayout(codex="%1", claude="%2", input="%3", sidebar="%4")
     )
 
-    # should only type literal text — no Escape, no C-m
+    # should only type literal text — no Escape, no C-m — in one tmux call
     assert calls == [
-        ["send-keys", "-t", "%1", "-l", "--", "$claodex"],
-        ["send-keys", "-t", "%2", "-l", "--", "/claodex"],
+        [
+            "send-keys", "-t", "%1", "-l", "--", "$claodex",
+            ";",
+            "send-keys", "-t", "%2", "-l", "--", "/claodex",
+        ],
     ]
     assert warnings == []
 
@@ -139,12 +143,65 @@ def test_prefill_skill_commands_returns_warning_when_unconfirmed(monkeypatch):
     )
 
     assert calls == [
-        ["send-keys", "-t", "%1", "-l", "--", "$claodex"],
-        ["send-keys", "-t", "%2", "-l", "--", "/claodex"],
+        [
+            "send-keys", "-t", "%1", "-l", "--", "$claodex",
+            ";",
+            "send-keys", "-t", "%2", "-l", "--", "/claodex",
+        ],
     ]
     assert warnings == ["prefill not confirmed for claude; type /claodex manually"]
 
 
+def test_run_tmux_chain_escapes_arguments_ending_in_semicolon(monkeypatch):
+    calls: list[list[str]] = []
+
+    def fake_run_tmux(args: list[str], **kwargs):
+        _ = kwargs
+        calls.append(args)
+        return subprocess.CompletedProcess(args=args, returncode=0, stdout="", stderr="")
+
+    monkeypatch.setattr("claodex.tmux_ops._run_tmux", fake_run_tmux)
+
+    _run_tmux_chain(
+        [
+            ["send-keys", "-t", "%1", "cd '/work;'", "C-m"],
+            ["send-keys", "-t", "%2", "-l", "--", "echo a;"],
+        ]
+    )
+
+    # only trailing semicolons are separators to tmux; inner ones pass through
+    assert calls == [
+        [
+            "send-keys", "-t", "%1", "cd '/work;'", "C-m",
+            ";",
+            "send-keys", "-t", "%2", "-l", "--", "echo a\\;",
+        ]
+    ]
+
+
+def test_start_agent_processes_launches_both_agents_in_one_tmux_call(monkeypatch):
+    calls: list[list[str]] = []
+
+    def fake_run_tmux(args: list[str], **kwargs):
+        _ = kwargs
+        calls.append(args)
+        return subprocess.CompletedProcess(args=args, returncode=0, stdout="", stderr="")
+
+    monkeypatch.setattr("claodex.tmux_ops._run_tmux", fake_run_tmux)
+
+    layout = PaneLayout(codex="%1", claude="%2", input="%3", sidebar="%4")
+    start_agent_processes(layout, Path("/workspace"))
+
+    env_prefix = "env -u CLAUDECODE -u CODEX_THREAD_ID -u CODEX_SANDBOX_ENV"
+    assert calls == [
+        [
+            "send-keys", "-t", "%1", f"cd '/workspace' && {env_prefix} codex", "C-m",
+            ";",
+            "send-keys", "-t", "%2", f"cd '/workspace' && {env_prefix} claude", "C-m",
+        ]
+    ]
+
+
 def test_start_sidebar_process_sends_sidebar_launch_command(monkeypatch):
     calls: list[list[str]] = []
 
@@ -295,6 +352,33 @@ def test_resolve_layout_requires_four_panes(monkeypatch):
         resolve_layout("claodex")
 
 
+@pytest.mark.parametrize(
+    ("tops", "message"),
+    [
+        ((0, 0, 0, 30), "could not resolve top-row panes"),
+        ((0, 30, 30, 30), "could not resolve top-row panes"),
+        ((0, 10, 20, 30), "could not resolve pane rows"),
+    ],
+)
+def test_resolve_layout_rejects_unbalanced_rows(monkeypatch, tops, message):
+    output = "\n".join(
+        f"%{index}\t{top}\t{index * 10}\t10\t10" for index, top in enumerate(tops)
+    )
+
+    def fake_run_tmux(args: list[str], **kwargs):
+        _ = (args, kwargs)
+        return subprocess.CompletedProcess(
+            args=["tmux", "list-panes"],
+            returncode=0,
+            stdout=output,
+            stderr="",
+        )
+
+    monkeypatch.setattr("claodex.tmux_ops._run_tmux", fake_run_tmux)
+    with pytest.raises(ClaodexError, match=message):
+        resolve_layout("claodex")
+
+
 def test_detect_tmux_pane_prefers_tmux_pane_environment(monkeypatch):
     monkeypatch.setenv("TMUX_PANE", "%42")
 
@@ -340,6 +424,16 @@ def test_submit_delay_honors_valid_override(monkeypatch):
     assert _submit_delay("x") == pytest.approx(0.75)
 
 
+def test_submit_delay_follows_override_changes(monkeypatch):
+    monkeypatch.setenv("CLAODEX_PASTE_SUBMIT_DELAY_SECONDS", "1.5")
+    assert _submit_delay("x") == pytest.approx(1.5)
+    assert _submit_delay("y" * 9000) == pytest.approx(1.5)
+
+    # a changed environment value is parsed afresh
+    monkeypatch.setenv("CLAODEX_PASTE_SUBMIT_DELAY_SECONDS", "0")
+    assert _submit_delay("x") == 0.0
+
+
 @pytest.mark.parametrize("value", ["abc", "-1", "nan", "inf", "11"])
 def test_submit_delay_rejects_invalid_override(monkeypatch, value):
     monkeypatch.setenv("CLAODEX_PASTE_SUBMIT_DELAY_SECONDS", value)
@@ -3,11 +3,12 @@ from __future__ import annotations
 import json
 import threading
 from datetime import datetime, timezone
+from unittest.mock import patch
 
 import pytest
 
 from claodex.errors import ClaodexError
-from claodex.ui import UIEventBus
+from claodex.ui import UIEventBus, _encode_metrics
 
 
 def _read_json(path):
@@ -48,6 +49,8 @@ def test_log_appends_event_jsonl(tmp_path):
     events_path = workspace / ".claodex" / "ui" / "events.jsonl"
     rows = events_path.read_text(encoding="utf-8").splitlines()
     assert len(rows) == 1
+    # compact, unsorted rows in schema key order
+    assert rows[0].startswith('{"ts":"2026-02-24T01:30:00+00:00","kind":"sent","agent":null,')
 
     event = json.loads(rows[0])
     assert event["ts"] == "2026-02-24T01:30:00+00:00"
@@ -58,6 +61,32 @@ def test_log_appends_event_jsonl(tmp_path):
     assert event["meta"] == {"turn": 1}
 
 
+def test_log_writes_each_event_as_one_utf8_line(tmp_path):
+    workspace = tmp_path / "workspace"
+    bus = UIEventBus(workspace, now_provider=_fixed_now)
+
+    with patch.object(bus._events_handle, "write", wraps=bus._events_handle.write) as write:
+        bus.log("system", "café ready")
+        bus.log("system", "second")
+    bus.close()
+
+    assert write.call_count == 2
+    raw = (workspace / ".claodex" / "ui" / "events.jsonl").read_bytes()
+    assert "café ready".encode("utf-8") in raw
+    assert raw.count(b"\n") == 2
+
+
+def test_log_defaults_to_aware_utc_timestamps(tmp_path):
+    workspace = tmp_path / "workspace"
+    bus = UIEventBus(workspace)
+    bus.log("system", "ready")
+    bus.close()
+
+    row = (workspace / ".claodex" / "ui" / "events.jsonl").read_text(encoding="utf-8")
+    stamp = datetime.fromisoformat(json.loads(row)["ts"])
+    assert stamp.utcoffset() == timezone.utc.utcoffset(None)
+
+
 def test_log_includes_null_optional_fields_when_unset(tmp_path):
     workspace = tmp_path / "workspace"
     bus = UIEventBus(workspace, now_provider=_fixed_now)
@@ -162,6 +191,29 @@ def test_update_metrics_is_thread_safe(tmp_path):
     assert metrics["collab_max"] == 10
 
 
+def test_update_metrics_never_overwrites_newer_snapshot(tmp_path):
+    workspace = tmp_path / "workspace"
+    bus = UIEventBus(workspace, now_provider=_fixed_now)
+    interleaved = []
+
+    def encode_with_concurrent_update(snapshot):
+        # another writer publishes and persists a newer snapshot while this
+        # one is still serializing outside the lock
+        if snapshot["collab_turn"] == 1 and not interleaved:
+            interleaved.append(True)
+            bus.update_metrics(collab_turn=2)
+        return _encode_metrics(snapshot)
+
+    with patch("claodex.ui._encode_metrics", encode_with_concurrent_update):
+        bus.update_metrics(collab_turn=1, collab_max=10)
+    bus.close()
+
+    metrics = _read_json(workspace / ".claodex" / "ui" / "metrics.json")
+    assert interleaved == [True]
+    assert metrics["collab_turn"] == 2
+    assert metrics["collab_max"] == 10
+
+
 def test_writes_after_close_raise_error(tmp_path):
     bus = UIEventBus(tmp_path / "workspace", now_provider=_fixed_now)
     bus.close()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from claodex.watch import FileWatcher
+
+
+def _append_later(path, delay: float) -> threading.Timer:
+    def append() -> None:
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write("row\n")
+
+    timer = threading.Timer(delay, append)
+    timer.start()
+    return timer
+
+
+def test_file_watcher_wait_times_out_without_changes(tmp_path):
+    session = tmp_path / "session.jsonl"
+    session.write_text("", encoding="utf-8")
+    watcher = FileWatcher()
+    watcher.watch(session)
+
+    started = time.monotonic()
+    assert watcher.wait(0.05) is False
+    assert time.monotonic() - started >= 0.04
+    watcher.close()
+
+
+def test_file_watcher_wakes_on_append(tmp_path):
+    watcher = FileWatcher()
+    if not watcher.active:
+        pytest.skip("inotify unavailable on this platform")
+    session = tmp_path / "session.jsonl"
+    session.write_text("", encoding="utf-8")
+    watcher.watch(session)
+
+    timer = _append_later(session, 0.05)
+    started = time.monotonic()
+    assert watcher.wait(5.0) is True
+    assert time.monotonic() - started < 2.0
+    timer.join()
+    watcher.close()
+
+
+def test_file_watcher_ignores_unwatched_sibling(tmp_path):
+    watcher = FileWatcher()
+    if not watcher.active:
+        pytest.skip("inotify unavailable on this platform")
+    session = tmp_path / "session.jsonl"
+    session.write_text("", encoding="utf-8")
+    watcher.watch(session)
+
+    timer = _append_later(tmp_path / "other.jsonl", 0.01)
+    assert watcher.wait(0.2) is False
+    timer.join()
+    watcher.close()
+
+
+def test_file_watcher_wait_filters_to_requested_paths(tmp_path):
+    watcher = FileWatcher()
+    if not watcher.active:
+        pytest.skip("inotify unavailable on this platform")
+    target = tmp_path / "claude.jsonl"
+    peer = tmp_path / "codex.jsonl"
+    for path in (target, peer):
+        path.write_text("", encoding="utf-8")
+        watcher.watch(path)
+
+    peer_timer = _append_later(peer, 0.01)
+    assert watcher.wait(0.2, paths=[target]) is False
+    peer_timer.join()
+
+    target_timer = _append_later(target, 0.05)
+    assert watcher.wait(5.0, paths=[target]) is True
+    target_timer.join()
+    watcher.close()